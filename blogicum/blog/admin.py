@@ -1,8 +1,90 @@
 from django.contrib import admin
+from django.contrib.admin.views.main import PAGE_VAR
+from django.db.models import Q
+from django.utils import timezone
 
-from .models import Category, Location, Post
+from .models import Category, Comment, ImageJob, Location, Post
+from .paginators import LimitedCountPaginator
+from .search import is_available, matching_post_ids, to_match_query
 
 
-admin.site.register(Category)
-admin.site.register(Location)
-admin.site.register(Post)
+class CountlessAdmin(admin.ModelAdmin):
+    paginator = LimitedCountPaginator
+    show_full_result_count = False
+
+    def get_paginator(self, request, queryset, per_page, orphans=0,
+                      allow_empty_first_page=True):
+        # Номер страницы — чтобы подсчёт дошёл до неё и за неё.
+        try:
+            number = int(request.GET.get(PAGE_VAR, 1))
+        except ValueError:
+            number = 1
+        return self.paginator(
+            queryset, per_page, orphans, allow_empty_first_page,
+            number=number,
+        )
+
+
+@admin.register(Category)
+class CategoryAdmin(admin.ModelAdmin):
+    list_display = ('title', 'slug', 'is_published', 'created_at')
+    list_editable = ('is_published',)
+    search_fields = ('title', 'slug')
+    prepopulated_fields = {'slug': ('title',)}
+
+
+@admin.register(Location)
+class LocationAdmin(admin.ModelAdmin):
+    list_display = ('name', 'is_published', 'created_at')
+    list_editable = ('is_published',)
+    search_fields = ('name',)
+
+
+@admin.register(Post)
+class PostAdmin(CountlessAdmin):
+    list_display = (
+        'title', 'author', 'category', 'location', 'pub_date',
+        'is_published', 'comment_count',
+    )
+    list_editable = ('is_published',)
+    list_select_related = ('author', 'category', 'location')
+    list_filter = ('is_published',)
+    search_fields = ('title', 'author__username__exact')
+    raw_id_fields = ('author',)
+    autocomplete_fields = ('category', 'location')
+
+    def get_search_results(self, request, queryset, search_term):
+        # Поиск по заголовку и тексту через полнотекстовый индекс
+        # вместо LIKE по всей таблице.
+        if not to_match_query(search_term) or not is_available():
+            return super().get_search_results(
+                request, queryset, search_term
+            )
+        return queryset.filter(
+            Q(pk__in=matching_post_ids(search_term))
+            | Q(author__username=search_term.strip())
+        ), False
+
+
+@admin.register(Comment)
+class CommentAdmin(CountlessAdmin):
+    list_display = ('__str__', 'post', 'created_at', 'is_published')
+    list_select_related = ('author', 'post')
+    list_filter = ('is_published',)
+    search_fields = ('author__username__exact',)
+    raw_id_fields = ('post', 'author')
+
+
+@admin.register(ImageJob)
+class ImageJobAdmin(CountlessAdmin):
+    list_display = ('source', 'post', 'status', 'attempts', 'run_after')
+    list_filter = ('status',)
+    raw_id_fields = ('post',)
+    readonly_fields = ('attempts', 'locked_at', 'last_error', 'created_at')
+    actions = ('retry',)
+
+    @admin.action(description='Повторить обработку')
+    def retry(self, request, queryset):
+        queryset.exclude(status=ImageJob.RUNNING).update(
+            status=ImageJob.PENDING, attempts=0, run_after=timezone.now()
+        )
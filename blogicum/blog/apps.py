@@ -1,7 +1,23 @@
 from django.apps import AppConfig
+from django.db.models.signals import post_migrate
+
+
+def ensure_search_index(using, **kwargs):
+    from django.db import connections
+
+    from .search import ensure_search_triggers, is_available
+
+    connection = connections[using]
+    if is_available(connection):
+        ensure_search_triggers(connection)
 
 
 class BlogConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'blog'
     verbose_name = "Блог"
+
+    def ready(self):
+        from . import signals  # noqa: F401
+
+        post_migrate.connect(ensure_search_index, sender=self)
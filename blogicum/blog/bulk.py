@@ -0,0 +1,82 @@
+import time
+from contextlib import contextmanager
+
+from django.db.models import Max
+
+
+class IdSequence:
+    """Первичные ключи для bulk_create, выданные заранее.
+
+    SQLite-бэкенд Django 3.2 не возвращает id из bulk_create, а на
+    новые строки нужно ссылаться сразу (посты — из комментариев).
+    Ключи выдаются от MAX(id) + 1: во время загрузки в таблицу
+    никто другой писать не должен.
+    """
+
+    def __init__(self, model):
+        top = model.objects.aggregate(top=Max('pk'))['top'] or 0
+        self.start = self.next_id = self.written = top + 1
+
+    def take(self, pk=None):
+        """Свободный ключ или переданный ключ из источника."""
+        if pk is None:
+            pk = self.next_id
+        self.next_id = max(self.next_id, pk + 1)
+        return pk
+
+    def may_exist(self, pk):
+        """Ключ мог быть занят до загрузки или записанной порцией."""
+        return pk < self.written
+
+    def mark_written(self):
+        """Все выданные ключи записаны в базу."""
+        self.written = self.next_id
+
+
+@contextmanager
+def keep_auto_now(*models):
+    """Сохранять переданные значения полей auto_now/auto_now_add.
+
+    Иначе bulk_create перезапишет даты из источника текущим временем.
+    Флаги полей общие для процесса: только для команд управления.
+    """
+    fields = [
+        field
+        for model in models
+        for field in model._meta.concrete_fields
+        if getattr(field, 'auto_now', False)
+        or getattr(field, 'auto_now_add', False)
+    ]
+    saved = [(field, field.auto_now, field.auto_now_add) for field in fields]
+    for field in fields:
+        field.auto_now = field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field, auto_now, auto_now_add in saved:
+            field.auto_now, field.auto_now_add = auto_now, auto_now_add
+
+
+class Throughput:
+    """Счётчик строк и скорости загрузки."""
+
+    def __init__(self):
+        self.started = time.monotonic()
+        self.rows = 0
+
+    def add(self, rows):
+        self.rows += rows
+
+    @property
+    def elapsed(self):
+        return time.monotonic() - self.started
+
+    @property
+    def rate(self):
+        return self.rows / self.elapsed if self.elapsed else 0
+
+    def __str__(self):
+        return (
+            f'{self.rows} строк за {self.elapsed:.1f} с'
+            f' ({self.rate:.0f} строк/с)'
+        )
@@ -0,0 +1,138 @@
+import hashlib
+from uuid import uuid4
+
+from django.conf import settings
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.template.loader import render_to_string
+from django.utils.cache import (
+    get_conditional_response, patch_cache_control, patch_vary_headers)
+from django.utils.http import quote_etag
+
+from blogicum.routers import replica_in_use
+
+FEED_VERSION_KEY = 'version:feed'
+
+CATEGORIES_VERSION_KEY = 'version:categories'
+
+# Поколение счётчиков лент (blog.counts): меняется при выходе
+# отложенной публикации и после массовой загрузки.
+COUNTS_VERSION_KEY = 'version:counts'
+
+
+def version_key(model_name, pk):
+    return f'version:{model_name}:{pk}'
+
+
+def bump_versions(*keys):
+    """Сменить метки версий: зависящие от них записи кэша устаревают."""
+    cache.set_many({key: uuid4().hex for key in keys}, None)
+
+
+def get_versions(keys):
+    """Текущие метки версий; отсутствующие создаются на месте.
+
+    Метка — случайный токен, а не счётчик: после вытеснения ключа
+    из кэша новая метка не совпадёт ни с одной из прежних.
+    """
+    versions = cache.get_many(keys)
+    missing = [key for key in keys if key not in versions]
+    for key in missing:
+        cache.add(key, uuid4().hex, None)
+    if missing:
+        versions.update(cache.get_many(missing))
+    return versions
+
+
+def post_card_dependencies(post):
+    keys = [
+        version_key('post', post.pk),
+        version_key('category', post.category_id),
+        version_key('user', post.author_id),
+    ]
+    if post.location_id is not None:
+        keys.append(version_key('location', post.location_id))
+    return keys
+
+
+def get_post_cards(posts):
+    """HTML карточек публикаций {id: html} за два обращения к кэшу."""
+    dependencies = {post.pk: post_card_dependencies(post) for post in posts}
+    versions = get_versions(
+        list({key for keys in dependencies.values() for key in keys})
+    )
+    card_keys = {
+        pk: 'post_card:{}:{}'.format(
+            pk, ':'.join(versions[key] for key in keys)
+        )
+        for pk, keys in dependencies.items()
+    }
+    cards = cache.get_many(list(card_keys.values()))
+    rendered = {}
+    for post in posts:
+        key = card_keys[post.pk]
+        if key not in cards:
+            cards[key] = rendered[key] = render_to_string(
+                'includes/post_card.html', {'post': post}
+            )
+    # Реплика может отставать: карточка из её данных легла бы в кэш
+    # под уже новыми метками версий.
+    if rendered and not replica_in_use():
+        cache.set_many(rendered, settings.POST_CARD_CACHE_TIMEOUT)
+    return {pk: cards[key] for pk, key in card_keys.items()}
+
+
+def posts_dependencies(posts):
+    return [
+        key for post in posts for key in post_card_dependencies(post)
+    ]
+
+
+def page_cache_key(request):
+    url = request.build_absolute_uri().encode()
+    return f'page:{hashlib.md5(url).hexdigest()}'
+
+
+def _page_etag(versions):
+    tokens = ':'.join(versions[key] for key in sorted(versions))
+    return hashlib.md5(tokens.encode()).hexdigest()
+
+
+def _patch_page_headers(response, etag):
+    response['ETag'] = quote_etag(etag)
+    patch_cache_control(
+        response, public=True, max_age=settings.PAGE_CACHE_MAX_AGE
+    )
+    patch_vary_headers(response, ('Cookie',))
+
+
+def get_cached_page(request):
+    """Страница из кэша, если не изменилась ни одна её зависимость."""
+    entry = cache.get(page_cache_key(request))
+    if entry is None:
+        return None
+    if cache.get_many(list(entry['versions'])) != entry['versions']:
+        return None
+    response = HttpResponse(
+        entry['content'], content_type=entry['content_type']
+    )
+    etag = _page_etag(entry['versions'])
+    _patch_page_headers(response, etag)
+    return get_conditional_response(
+        request, etag=quote_etag(etag), response=response
+    )
+
+
+def set_cached_page(request, response, dependencies, timeout):
+    versions = get_versions(list(set(dependencies)))
+    if timeout is None or timeout > 0:
+        cache.set(
+            page_cache_key(request),
+            {
+                'versions': versions,
+                'content': response.content,
+                'content_type': response['Content-Type'],
+            },
+            timeout,
+        )
+    _patch_page_headers(response, _page_etag(versions))
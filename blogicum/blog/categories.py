@@ -0,0 +1,38 @@
+from django.core.cache import cache
+
+from .cache import CATEGORIES_VERSION_KEY, get_versions
+from .models import Category
+
+# Копия реестра в памяти процесса: (метка версии, {slug: категория}).
+_local = (None, {})
+
+
+def published_categories():
+    """Опубликованные категории {slug: Category}.
+
+    Реестр хранится в общем кэше под меткой CATEGORIES_VERSION_KEY и
+    копируется в память процесса; сохранение или удаление категории
+    сменяет метку (см. blog.signals). При неизменной метке — одно
+    обращение к кэшу и ни одного запроса к БД. Кэш должен быть общим
+    для всех процессов (settings.CACHES): иначе смену метки увидит
+    только процесс, сохранивший категорию.
+    """
+    global _local
+    version = get_versions([CATEGORIES_VERSION_KEY])[CATEGORIES_VERSION_KEY]
+    local_version, categories = _local
+    if local_version == version:
+        return categories
+    key = f'categories:{version}'
+    categories = cache.get(key)
+    if categories is None:
+        categories = {
+            category.slug: category
+            for category in Category.objects.filter(is_published=True)
+        }
+        cache.set(key, categories, None)
+    _local = (version, categories)
+    return categories
+
+
+def get_published_category(slug):
+    return published_categories().get(slug)
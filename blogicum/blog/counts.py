@@ -0,0 +1,108 @@
+from collections import Counter
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import DEFERRED, Count
+from django.utils import timezone
+
+from .cache import COUNTS_VERSION_KEY, bump_versions, get_versions
+from .categories import published_categories
+from .models import Post
+from .schedule import feed_valid_until
+
+# Ленты со счётчиками:
+#   feed              — главная;
+#   category:<id>     — категория;
+#   author:<id>       — профиль для гостей;
+#   author:<id>:all   — профиль для автора, с черновиками.
+
+
+def _prefix():
+    version = get_versions([COUNTS_VERSION_KEY])[COUNTS_VERSION_KEY]
+    return f'count:{version}:'
+
+
+def get_feed_count(feed, queryset):
+    """Число публикаций ленты: из кэша или COUNT(*) при промахе."""
+    key = _prefix() + feed
+    count = cache.get(key)
+    if count is not None:
+        # Наступившая отложенная публикация сменяет поколение
+        # счётчиков; подсчёту при промахе проверка не нужна.
+        feed_valid_until()
+        key = _prefix() + feed
+        count = cache.get(key)
+    if count is None:
+        count = queryset.count()
+        cache.add(key, count, settings.FEED_COUNT_TIMEOUT)
+    return count
+
+
+def adjust_counts(deltas):
+    """Сдвинуть закэшированные счётчики лент на {лента: delta}.
+
+    Отсутствующие в кэше счётчики не создаются: их посчитает
+    get_feed_count() при первом показе ленты.
+    """
+    prefix = _prefix()
+    for feed, delta in deltas.items():
+        if not delta:
+            continue
+        try:
+            cache.incr(prefix + feed, delta)
+        except ValueError:
+            pass
+
+
+def reset_counts():
+    bump_versions(COUNTS_VERSION_KEY)
+
+
+def post_feeds(fields):
+    """Ленты, в которых видна публикация с полями TRACKED_FIELDS."""
+    author_id = fields['author_id']
+    feeds = [f'author:{author_id}:all']
+    published_ids = {
+        category.pk for category in published_categories().values()
+    }
+    if (
+        fields['is_published']
+        and fields['pub_date'] <= timezone.now()
+        and fields['category_id'] in published_ids
+    ):
+        feeds += ['feed', f'category:{fields["category_id"]}',
+                  f'author:{author_id}']
+    return feeds
+
+
+def post_changed(old, new):
+    """Учесть переход публикации из состояния old в new.
+
+    old и new — поля TRACKED_FIELDS или None (публикации не было или
+    больше нет). Если прежнее состояние неизвестно, все счётчики
+    пересчитываются.
+    """
+    if old is not None and DEFERRED in old.values():
+        reset_counts()
+        return
+    deltas = Counter()
+    if old is not None:
+        deltas.subtract(post_feeds(old))
+    if new is not None:
+        deltas.update(post_feeds(new))
+    adjust_counts(deltas)
+
+
+def category_visibility_changed(category):
+    """Публикации категории появились в лентах или пропали из них."""
+    sign = 1 if category.is_published else -1
+    authors = Post.objects.filter(
+        category=category, is_published=True, pub_date__lte=timezone.now()
+    ).order_by().values('author_id').annotate(total=Count('pk'))
+    deltas = Counter()
+    for row in authors:
+        deltas['feed'] += sign * row['total']
+        deltas[f'author:{row["author_id"]}'] += sign * row['total']
+    adjust_counts(deltas)
+    # Лента скрытой категории не обновлялась — посчитается заново.
+    cache.delete(_prefix() + f'category:{category.pk}')
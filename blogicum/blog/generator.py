@@ -0,0 +1,186 @@
+import random
+from array import array
+from contextlib import nullcontext
+from datetime import datetime, timedelta
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.db import transaction
+from django.utils import timezone
+
+from .bulk import IdSequence, Throughput, keep_auto_now
+from .cache import (
+    CATEGORIES_VERSION_KEY, COUNTS_VERSION_KEY, FEED_VERSION_KEY,
+    bump_versions)
+from .models import Category, Comment, Location, Post, UserStats
+from .schedule import reset_next_publication
+from .search import is_available, search_index_deferred
+
+User = get_user_model()
+
+WORDS = (
+    'город утро дорога лес река море гора дом окно сад поезд письмо'
+    ' книга друг вечер зима лето осень весна солнце ветер дождь снег'
+    ' небо поле мост остров берег путь кофе чай хлеб рынок музей парк'
+    ' площадь улица история память новость работа проект встреча'
+    ' праздник погода неделя минута фото заметка мысль идея вопрос'
+    ' ответ рассказ маршрут карта остановка вокзал аэропорт отпуск'
+    ' тишина музыка песня фильм театр выставка кухня рецепт ужин'
+    ' завтрак прогулка велосипед озеро поход палатка костёр звезда'
+    ' луна утренний тёплый тихий новый старый большой маленький'
+    ' далёкий близкий светлый тёмный быстрый медленный красивый'
+    ' интересный простой важный шёл видел писал думал читал ждал'
+).split()
+
+
+class LoadDataGenerator:
+    """Синтетические данные для нагрузочных тестов.
+
+    Популярность подчиняется степенному закону: доля объектов
+    с малым номером получает большую часть публикаций и комментариев
+    (чем больше skew, тем сильнее перекос). Строки создаются
+    bulk_create порциями по chunk_size в отдельных транзакциях.
+    """
+
+    def __init__(self, skew=3.0, days=365, future=0.02, unpublished=0.05,
+                 chunk_size=10000, seed=None, progress=None):
+        self.rng = random.Random(seed)
+        self.skew = skew
+        self.now = timezone.now()
+        self.days = days
+        self.future = future
+        self.unpublished = unpublished
+        self.chunk_size = chunk_size
+        self.progress = progress
+        self.throughput = Throughput()
+        self.created = {}
+
+    def pick(self, first_id, count):
+        """Номер из диапазона с перекосом к началу."""
+        return first_id + int(count * self.rng.random() ** self.skew)
+
+    def sentence(self, low, high):
+        words = self.rng.choices(WORDS, k=self.rng.randint(low, high))
+        return ' '.join(words).capitalize()
+
+    def text(self):
+        return '. '.join(
+            self.sentence(6, 14) for _ in range(self.rng.randint(1, 5))
+        ) + '.'
+
+    def _insert(self, model, make, count):
+        """Создать count строк model порциями; make(pk) — одна строка."""
+        ids = IdSequence(model)
+        first_id = ids.next_id
+        done = 0
+        while done < count:
+            size = min(self.chunk_size, count - done)
+            objs = [make(ids.take()) for _ in range(size)]
+            with transaction.atomic():
+                model.objects.bulk_create(objs)
+            done += size
+            self.throughput.add(size)
+            if self.progress is not None:
+                self.progress(model._meta.model_name, done, count)
+        self.created[model._meta.model_name] = count
+        return first_id
+
+    def users(self, count):
+        # Все пользователи без пароля: хэш вычисляется один раз.
+        password = make_password(None)
+        return self._insert(User, lambda pk: User(
+            id=pk,
+            username=f'load{pk}',
+            email=f'load{pk}@example.com',
+            password=password,
+            date_joined=self.now - timedelta(days=self.days),
+        ), count)
+
+    def categories(self, count):
+        return self._insert(Category, lambda pk: Category(
+            id=pk,
+            title=self.sentence(1, 3),
+            description=self.sentence(5, 10),
+            slug=f'load-{pk}',
+            is_published=self.rng.random() >= self.unpublished,
+            created_at=self.now,
+        ), count)
+
+    def locations(self, count):
+        return self._insert(Location, lambda pk: Location(
+            id=pk,
+            name=self.sentence(1, 2),
+            is_published=self.rng.random() >= self.unpublished,
+            created_at=self.now,
+        ), count)
+
+    def posts(self, count, users, categories, locations):
+        # Моменты публикации по порядку постов — для дат комментариев.
+        self.pub_times = array('d')
+        span = self.days * 86400
+
+        def make(pk):
+            if self.rng.random() < self.future:
+                pub_date = self.now + timedelta(
+                    seconds=self.rng.random() * 30 * 86400
+                )
+            else:
+                pub_date = self.now - timedelta(
+                    seconds=self.rng.random() * span
+                )
+            self.pub_times.append(pub_date.timestamp())
+            location = None
+            if locations[1] and self.rng.random() < 0.7:
+                location = self.pick(*locations)
+            return Post(
+                id=pk,
+                title=self.sentence(2, 8),
+                text=self.text(),
+                pub_date=pub_date,
+                author_id=self.pick(*users),
+                category_id=self.pick(*categories),
+                location_id=location,
+                is_published=self.rng.random() >= self.unpublished,
+                created_at=min(pub_date, self.now),
+            )
+
+        return self._insert(Post, make, count)
+
+    def comments(self, count, users, posts):
+        now = self.now.timestamp()
+        first_post, post_count = posts
+
+        def make(pk):
+            post_id = self.pick(first_post, post_count)
+            published = self.pub_times[post_id - first_post]
+            created = published + self.rng.random() * max(now - published, 0)
+            return Comment(
+                id=pk,
+                post_id=post_id,
+                author_id=self.pick(*users),
+                text=self.sentence(3, 20) + '.',
+                is_published=self.rng.random() >= self.unpublished,
+                created_at=datetime.fromtimestamp(created, tz=timezone.utc),
+            )
+
+        return self._insert(Comment, make, count)
+
+    def run(self, users, categories, locations, posts, comments):
+        search = search_index_deferred() if is_available() else nullcontext()
+        with keep_auto_now(Category, Location, Post, Comment), search:
+            user_ids = (self.users(users), users)
+            category_ids = (self.categories(categories), categories)
+            location_ids = (self.locations(locations), locations)
+            post_ids = (
+                self.posts(posts, user_ids, category_ids, location_ids),
+                posts,
+            )
+            self.comments(comments, user_ids, post_ids)
+        # Счётчики — по одному UPDATE после загрузки.
+        Post.objects.recount_comments()
+        UserStats.objects.rebuild()
+        bump_versions(
+            FEED_VERSION_KEY, CATEGORIES_VERSION_KEY, COUNTS_VERSION_KEY
+        )
+        reset_next_publication()
+        return self.created
@@ -0,0 +1,183 @@
+import hashlib
+import logging
+import posixpath
+import traceback
+from io import BytesIO
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from PIL import Image, ImageOps, UnidentifiedImageError, features
+
+from .cache import bump_versions, version_key
+
+logger = logging.getLogger(__name__)
+
+# Повтор не поможет: файл не читается как изображение.
+PERMANENT_ERRORS = (UnidentifiedImageError, Image.DecompressionBombError)
+
+# (ключ в image_variants, формат Pillow, расширение файла)
+FORMATS = (
+    ('webp', 'WEBP', 'webp'),
+    ('jpeg', 'JPEG', 'jpg'),
+)
+
+
+def _flatten(image):
+    """RGB-копия изображения; прозрачность заменяется белым фоном."""
+    if image.mode in ('RGBA', 'LA') or 'transparency' in image.info:
+        image = image.convert('RGBA')
+        background = Image.new('RGB', image.size, 'white')
+        background.paste(image, mask=image.getchannel('A'))
+        return background
+    return image.convert('RGB')
+
+
+def _save_variant(storage, name, image, image_format):
+    if storage.exists(name):
+        return name
+    buffer = BytesIO()
+    image.save(
+        buffer,
+        format=image_format,
+        quality=settings.POST_IMAGE_QUALITY,
+        optimize=True,
+    )
+    return storage.save(name, ContentFile(buffer.getvalue()))
+
+
+def build_image_variants(field_file):
+    """Уменьшенные копии изображения публикации в WebP и JPEG.
+
+    Файлы лежат рядом с оригиналом, в имени — хэш его содержимого:
+    повторная загрузка того же файла переиспользует готовые копии,
+    а их URL меняется только вместе с содержимым. Увеличения нет:
+    ширины больше исходной заменяются исходной.
+    """
+    with field_file.open('rb'):
+        data = field_file.read()
+    digest = hashlib.sha256(data).hexdigest()[:16]
+    directory = posixpath.dirname(field_file.name)
+    with Image.open(BytesIO(data)) as source:
+        image = _flatten(ImageOps.exif_transpose(source))
+    formats = [
+        item for item in FORMATS
+        if item[0] != 'webp' or features.check('webp')
+    ]
+    variants = []
+    widths = sorted(
+        {min(width, image.width) for width in settings.POST_IMAGE_WIDTHS}
+    )
+    for width in widths:
+        resized = image
+        if width < image.width:
+            height = max(1, round(image.height * width / image.width))
+            resized = image.resize((width, height), Image.LANCZOS)
+        variant = {'width': width, 'height': resized.height}
+        for key, image_format, extension in formats:
+            variant[key] = _save_variant(
+                field_file.storage,
+                posixpath.join(directory, f'{digest}_{width}w.{extension}'),
+                resized,
+                image_format,
+            )
+        variants.append(variant)
+    return {
+        'source': field_file.name,
+        'width': image.width,
+        'height': image.height,
+        'variants': variants,
+    }
+
+
+def strip_metadata(field_file):
+    """Сохранить копию оригинала фото без EXIF (геометки, модель камеры).
+
+    Поворот из EXIF применяется к пикселям, чтобы фото не «легло на
+    бок». Копия пишется под новым именем, field_file переключается
+    на неё, а оригинал остаётся на месте: удаляет его вызывающий,
+    когда на копию переключится публикация. Возвращает True, если
+    копия создана.
+    """
+    with field_file.open('rb'):
+        data = field_file.read()
+    with Image.open(BytesIO(data)) as source:
+        if not source.getexif():
+            return False
+        # MPO — JPEG с несколькими кадрами с камер телефонов.
+        image_format = 'JPEG' if source.format == 'MPO' else source.format
+        image = ImageOps.exif_transpose(source)
+        buffer = BytesIO()
+        options = {'quality': 95} if image_format == 'JPEG' else {}
+        image.save(buffer, format=image_format, **options)
+    # Имя занято оригиналом — storage подберёт свободное.
+    field_file.name = field_file.storage.save(
+        field_file.name, ContentFile(buffer.getvalue())
+    )
+    return True
+
+
+def save_image_variants(post, image_variants, image=None):
+    """Записать результат обработки в обход сигналов post_save.
+
+    Возвращает True, если строка публикации обновлена.
+    """
+    post.image_variants = image_variants
+    fields = {'image_variants': image_variants}
+    queryset = type(post).objects.filter(pk=post.pk)
+    if image is not None:
+        # Фото могли сменить, пока шла обработка, — тогда результат
+        # устарел и его подхватит следующая задача.
+        queryset = queryset.filter(image=image)
+        fields['image'] = post.image.name
+    updated = bool(queryset.update(**fields))
+    if updated:
+        bump_versions(version_key('post', post.pk))
+    return updated
+
+
+def process_post_image(post):
+    """Очистить метаданные и построить копии фото (с его размерами)."""
+    image = post.image.name
+    if not strip_metadata(post.image):
+        save_image_variants(post, build_image_variants(post.image), image)
+        return
+    storage, stripped = post.image.storage, post.image.name
+    try:
+        saved = save_image_variants(
+            post, build_image_variants(post.image), image
+        )
+    except Exception:
+        # Оригинал цел: повтор задачи начнёт с него.
+        post.image.name = image
+        storage.delete(stripped)
+        raise
+    # Удаляется файл, на который публикация больше не ссылается.
+    storage.delete(image if saved else stripped)
+
+
+def run_image_job(job):
+    """Выполнить захваченную задачу ImageJob; вернуть её статус."""
+    post = job.post
+    if post.image.name != job.source:
+        # Фото сменилось: его обработает более поздняя задача.
+        job.complete()
+        return job.status
+    try:
+        process_post_image(post)
+    except Exception as error:
+        logger.warning(
+            'Не удалось обработать фото %s (попытка %s)',
+            job.source, job.attempts, exc_info=True,
+        )
+        job.fail(
+            traceback.format_exc(),
+            permanent=isinstance(error, PERMANENT_ERRORS),
+        )
+        if job.status == job.DEAD:
+            # Вместо заглушки навсегда — оригинал без копий.
+            save_image_variants(
+                post, {'source': job.source, 'variants': []}, job.source
+            )
+    else:
+        job.complete()
+    return job.status
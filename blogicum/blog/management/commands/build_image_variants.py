@@ -0,0 +1,33 @@
+from django.core.management.base import BaseCommand
+
+from blog.images import process_post_image
+from blog.models import Post
+
+
+class Command(BaseCommand):
+    help = (
+        'Обрабатывает фото публикаций сразу, без очереди: копии, EXIF,'
+        ' размеры.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--force', action='store_true',
+            help='Обработать заново и уже готовые фото.',
+        )
+
+    def handle(self, *args, **options):
+        posts = Post.objects.exclude(image='').only('image', 'image_variants')
+        updated = 0
+        for post in posts.iterator():
+            if not options['force'] and not post.image_pending:
+                continue
+            try:
+                process_post_image(post)
+            except Exception as error:
+                self.stderr.write(f'{post.image.name}: {error}')
+                continue
+            updated += 1
+        self.stdout.write(
+            self.style.SUCCESS(f'Обновлено публикаций: {updated}')
+        )
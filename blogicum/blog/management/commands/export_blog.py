@@ -0,0 +1,60 @@
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+
+from blog.export import FIELDS, export_lines, export_records, parse_since
+
+
+class Command(BaseCommand):
+    help = (
+        'Выгружает пользователей, публикации и комментарии в JSONL или CSV'
+        ' в формате import_blog.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--output', default='-',
+            help='Файл выгрузки; по умолчанию — стандартный вывод.',
+        )
+        parser.add_argument(
+            '--format', choices=('jsonl', 'csv'), default='jsonl',
+        )
+        parser.add_argument(
+            '--model', choices=tuple(FIELDS),
+            help='Выгрузить одну модель (обязательно для CSV).',
+        )
+        parser.add_argument(
+            '--since',
+            help='Только записи, созданные начиная с даты (ISO 8601).',
+        )
+        parser.add_argument(
+            '--chunk-size', type=int, default=2000,
+            help='Строк в одном запросе к БД (по умолчанию 2000).',
+        )
+
+    def handle(self, *args, **options):
+        if options['format'] == 'csv' and not options['model']:
+            raise CommandError('Для CSV укажите --model.')
+        since = None
+        if options['since']:
+            try:
+                since = parse_since(options['since'])
+            except ValueError as error:
+                raise CommandError(error)
+        records = export_records(
+            models=(options['model'],) if options['model'] else tuple(FIELDS),
+            since=since,
+            chunk_size=options['chunk_size'],
+        )
+        output = (
+            sys.stdout if options['output'] == '-'
+            else open(options['output'], 'w', encoding='utf-8', newline='')
+        )
+        try:
+            for line in export_lines(
+                records, options['format'], options['model']
+            ):
+                output.write(line)
+        finally:
+            if output is not sys.stdout:
+                output.close()
@@ -0,0 +1,78 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from blog.generator import LoadDataGenerator
+
+
+class Command(BaseCommand):
+    help = (
+        'Создаёт синтетических пользователей, категории, местоположения,'
+        ' публикации и комментарии для нагрузочного тестирования.'
+    )
+
+    def add_arguments(self, parser):
+        for name, default in (
+            ('users', 1000),
+            ('categories', 20),
+            ('locations', 50),
+            ('posts', 10000),
+            ('comments', 50000),
+        ):
+            parser.add_argument(
+                f'--{name}', type=int, default=default,
+                help=f'Сколько создать (по умолчанию {default}).',
+            )
+        parser.add_argument(
+            '--skew', type=float, default=3.0,
+            help='Перекос популярности авторов и постов (1 — равномерно).',
+        )
+        parser.add_argument(
+            '--days', type=int, default=365,
+            help='Глубина архива публикаций в днях.',
+        )
+        parser.add_argument(
+            '--future', type=float, default=0.02,
+            help='Доля отложенных публикаций.',
+        )
+        parser.add_argument(
+            '--unpublished', type=float, default=0.05,
+            help='Доля снятых с публикации строк.',
+        )
+        parser.add_argument(
+            '--chunk-size', type=int, default=10000,
+            help='Строк в одной транзакции.',
+        )
+        parser.add_argument('--seed', type=int, help='Зерно генератора.')
+
+    def progress(self, model_name, done, total):
+        if self.verbosity > 1:
+            self.stdout.write(f'{model_name}: {done}/{total}')
+
+    def handle(self, *args, **options):
+        self.verbosity = options['verbosity']
+        if options['posts'] and not (
+            options['users'] and options['categories']
+        ):
+            raise CommandError('Для публикаций нужны --users и --categories.')
+        if options['comments'] and not (
+            options['users'] and options['posts']
+        ):
+            raise CommandError('Для комментариев нужны --users и --posts.')
+        generator = LoadDataGenerator(
+            skew=options['skew'],
+            days=options['days'],
+            future=options['future'],
+            unpublished=options['unpublished'],
+            chunk_size=options['chunk_size'],
+            seed=options['seed'],
+            progress=self.progress,
+        )
+        created = generator.run(
+            options['users'], options['categories'], options['locations'],
+            options['posts'], options['comments'],
+        )
+        summary = ', '.join(
+            f'{name}: {count}' for name, count in created.items()
+        )
+        self.stdout.write(self.style.SUCCESS(
+            f'Создано {summary}. {generator.throughput}'
+        ))
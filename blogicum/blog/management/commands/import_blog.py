@@ -0,0 +1,76 @@
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+
+from blog.importer import MODELS, BlogImporter, RecordError, read_records
+
+
+class Command(BaseCommand):
+    help = (
+        'Загружает пользователей, публикации и комментарии из JSONL или'
+        ' CSV порциями bulk_create.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'path', help='Файл с записями; «-» — стандартный ввод.',
+        )
+        parser.add_argument(
+            '--format', choices=('jsonl', 'csv'),
+            help='Формат файла; по умолчанию — по расширению.',
+        )
+        parser.add_argument(
+            '--model', choices=tuple(MODELS),
+            help='Модель строк CSV-файла.',
+        )
+        parser.add_argument(
+            '--chunk-size', type=int, default=5000,
+            help='Строк в одной транзакции (по умолчанию 5000).',
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=500,
+            help='Строк в одном INSERT (по умолчанию 500).',
+        )
+
+    def progress(self, importer):
+        if self.verbosity > 1:
+            self.stdout.write(str(importer.throughput))
+
+    def handle(self, *args, **options):
+        self.verbosity = options['verbosity']
+        path = options['path']
+        file_format = options['format'] or (
+            'csv' if path.endswith('.csv') else 'jsonl'
+        )
+        if file_format == 'csv' and not options['model']:
+            raise CommandError('Для CSV укажите --model.')
+        importer = BlogImporter(
+            chunk_size=options['chunk_size'],
+            batch_size=options['batch_size'],
+            progress=self.progress,
+        )
+        stream = (
+            sys.stdin if path == '-'
+            else open(path, encoding='utf-8', newline='')
+        )
+        try:
+            importer.run(
+                read_records(stream, file_format, options['model'])
+            )
+        except RecordError as error:
+            raise CommandError(
+                f'Ошибка в файле, {error}; загружено до неё:'
+                f' {dict(importer.created)}'
+            )
+        finally:
+            if stream is not sys.stdin:
+                stream.close()
+        for message in importer.errors:
+            self.stderr.write(f'Пропущено: {message}')
+        created = ', '.join(
+            f'{name}: {importer.created[name]}' for name in MODELS
+        )
+        self.stdout.write(self.style.SUCCESS(
+            f'Загружено {created}; пропущено: {importer.skipped}.'
+            f' {importer.throughput}'
+        ))
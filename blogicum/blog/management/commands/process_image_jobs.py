@@ -0,0 +1,34 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from blog.images import run_image_job
+from blog.models import ImageJob
+
+
+class Command(BaseCommand):
+    help = 'Обработчик очереди фото публикаций (модель ImageJob).'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--once', action='store_true',
+            help='Выполнить готовые к запуску задачи и завершиться.',
+        )
+        parser.add_argument(
+            '--sleep', type=float, default=5,
+            help='Пауза при пустой очереди, сек. (по умолчанию 5).',
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            ImageJob.objects.requeue_stale()
+            job = ImageJob.objects.claim()
+            if job is None:
+                if options['once']:
+                    return
+                time.sleep(options['sleep'])
+                continue
+            status = run_image_job(job)
+            self.stdout.write(
+                f'{job.source}: {status} (попытка {job.attempts})'
+            )
@@ -0,0 +1,44 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from blog.schedule import feed_valid_until, reset_next_publication
+
+
+class Command(BaseCommand):
+    help = (
+        'Сменяет поколение кэша лент в момент выхода отложенных публикаций.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--once', action='store_true',
+            help='Обработать наступившие публикации и завершиться.',
+        )
+        parser.add_argument(
+            '--max-sleep', type=float, default=60,
+            help='Наибольшая пауза между проверками, сек. (по умолчанию 60).',
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            feed_valid_until()
+            # Публикации могли измениться без сигнала (например, через
+            # QuerySet.update()), поэтому расписание перечитывается.
+            reset_next_publication()
+            valid_until = feed_valid_until()
+            if valid_until is None:
+                self.stdout.write('Отложенных публикаций нет.')
+            else:
+                self.stdout.write(
+                    f'Лента актуальна до {valid_until.isoformat()}.'
+                )
+            if options['once']:
+                return
+            delay = options['max_sleep']
+            if valid_until is not None:
+                delay = min(
+                    delay, (valid_until - timezone.now()).total_seconds()
+                )
+            time.sleep(max(delay, 0))
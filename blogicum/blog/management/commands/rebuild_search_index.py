@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from blog.search import (
+    ensure_search_triggers, is_available, rebuild_search_index)
+
+
+class Command(BaseCommand):
+    help = 'Перестраивает полнотекстовый индекс публикаций (SQLite FTS5).'
+
+    def handle(self, *args, **options):
+        if not is_available():
+            raise CommandError(
+                'Полнотекстовый поиск доступен только в SQLite.'
+            )
+        if not ensure_search_triggers():
+            rebuild_search_index()
+        self.stdout.write(self.style.SUCCESS('Поисковый индекс перестроен.'))
@@ -0,0 +1,22 @@
+from django.core.management.base import BaseCommand
+
+from blog.models import UserStats
+
+
+class Command(BaseCommand):
+    help = (
+        'Пересчитывает статистику профилей (UserStats) по публикациям'
+        ' и комментариям.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'user_ids', nargs='*', type=int,
+            help='id пользователей; по умолчанию — все пользователи.',
+        )
+
+    def handle(self, *args, **options):
+        updated = UserStats.objects.rebuild(options['user_ids'] or None)
+        self.stdout.write(
+            self.style.SUCCESS(f'Обновлено пользователей: {updated}')
+        )
@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+
+from blog.models import Post
+
+
+class Command(BaseCommand):
+    help = 'Пересчитывает денормализованное поле Post.comment_count.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'post_ids', nargs='*', type=int,
+            help='id публикаций; по умолчанию — все публикации.',
+        )
+
+    def handle(self, *args, **options):
+        updated = Post.objects.recount_comments(options['post_ids'] or None)
+        self.stdout.write(
+            self.style.SUCCESS(f'Обновлено публикаций: {updated}')
+        )
@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+
+from blogicum.warmup import warm_templates
+
+
+class Command(BaseCommand):
+    help = 'Загружает и компилирует все шаблоны проекта.'
+
+    def handle(self, *args, **options):
+        count, elapsed = warm_templates()
+        self.stdout.write(self.style.SUCCESS(
+            f'Загружено шаблонов: {count} за {elapsed * 1000:.0f} мс'
+        ))
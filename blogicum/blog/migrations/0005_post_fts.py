@@ -0,0 +1,34 @@
+from django.db import migrations
+
+FTS_TABLE = 'blog_post_fts'
+
+
+def create_fts_table(apps, schema_editor):
+    # Триггеры синхронизации и первичное заполнение индекса создаёт
+    # blog.search.ensure_search_triggers по сигналу post_migrate.
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    schema_editor.execute(
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5("
+        "title, text, content='blog_post', content_rowid='id', "
+        "tokenize='unicode61 remove_diacritics 2')"
+    )
+
+
+def drop_fts_table(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    for suffix in ('ai', 'ad', 'au'):
+        schema_editor.execute(f'DROP TRIGGER IF EXISTS {FTS_TABLE}_{suffix}')
+    schema_editor.execute(f'DROP TABLE IF EXISTS {FTS_TABLE}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0004_comment_post_created_idx'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_fts_table, drop_fts_table),
+    ]
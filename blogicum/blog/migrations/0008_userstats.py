@@ -0,0 +1,81 @@
+# Generated by Django 3.2.16 on 2026-10-18 19:32
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, Max, OuterRef, Subquery
+from django.db.models.functions import Coalesce, Greatest
+import django.db.models.deletion
+
+
+def _count(queryset, field):
+    return Coalesce(Subquery(
+        queryset.order_by().values(field).annotate(
+            total=Count('pk')
+        ).values('total')
+    ), 0)
+
+
+def _latest(queryset, field):
+    return Subquery(
+        queryset.order_by().values(field).annotate(
+            latest=Max('created_at')
+        ).values('latest')
+    )
+
+
+def fill_user_stats(apps, schema_editor):
+    # То же, что UserStats.objects.rebuild(), на исторических моделях:
+    # иначе статистика строится в запросе к профилю.
+    User = apps.get_model(settings.AUTH_USER_MODEL)
+    UserStats = apps.get_model('blog', 'UserStats')
+    Post = apps.get_model('blog', 'Post')
+    Comment = apps.get_model('blog', 'Comment')
+    UserStats.objects.bulk_create(
+        (
+            UserStats(user_id=pk)
+            for pk in User.objects.values_list('pk', flat=True).iterator()
+        ),
+        batch_size=500,
+    )
+    posts = Post.objects.filter(author=OuterRef('user_id'))
+    written = Comment.objects.filter(author=OuterRef('user_id'))
+    received = Comment.objects.filter(post__author=OuterRef('user_id'))
+    last_post = _latest(posts, 'author')
+    last_comment = _latest(written, 'author')
+    UserStats.objects.update(
+        published_posts=_count(posts.filter(is_published=True), 'author'),
+        total_posts=_count(posts, 'author'),
+        comments_written=_count(written, 'author'),
+        comments_received=_count(received, 'post__author'),
+        last_activity=Greatest(
+            Coalesce(last_post, last_comment),
+            Coalesce(last_comment, last_post),
+        ),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('blog', '0007_imagejob'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UserStats',
+            fields=[
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='stats', serialize=False, to=settings.AUTH_USER_MODEL, verbose_name='Пользователь')),
+                ('published_posts', models.PositiveIntegerField(default=0, verbose_name='Опубликовано публикаций')),
+                ('total_posts', models.PositiveIntegerField(default=0, verbose_name='Всего публикаций')),
+                ('comments_written', models.PositiveIntegerField(default=0, verbose_name='Написано комментариев')),
+                ('comments_received', models.PositiveIntegerField(default=0, verbose_name='Получено комментариев')),
+                ('last_activity', models.DateTimeField(blank=True, null=True, verbose_name='Последняя активность')),
+            ],
+            options={
+                'verbose_name': 'статистика пользователя',
+                'verbose_name_plural': 'Статистика пользователей',
+            },
+        ),
+        migrations.RunPython(fill_user_stats, migrations.RunPython.noop),
+    ]
@@ -1,6 +1,11 @@
-from django.db import models
+from datetime import timedelta
+
+from django.db import models, router
+from django.db.models import Count, F, Max, OuterRef, Subquery
+from django.db.models.functions import Coalesce, Greatest
 from django.contrib.auth import get_user_model
 from django.conf import settings
+from django.utils import timezone
 
 User = get_user_model()
 
@@ -24,9 +29,37 @@ class IsPublishedCreatedAt(models.Model):
         abstract = True
 
 
-class Category(IsPublishedCreatedAt):
+class SavedFieldsMixin:
+    """Значения TRACKED_FIELDS на момент загрузки или сохранения.
+
+    По ним обработчики post_save (blog.signals) понимают, что именно
+    изменилось, без повторного чтения строки из БД.
+    """
+
+    TRACKED_FIELDS = ()
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance.remember_saved_fields()
+        return instance
+
+    def remember_saved_fields(self):
+        # Не загруженные (defer) поля помечаются DEFERRED.
+        self.saved_fields = {
+            name: self.__dict__.get(name, models.DEFERRED)
+            for name in self.TRACKED_FIELDS
+        }
+
+    def tracked_fields(self):
+        return {name: getattr(self, name) for name in self.TRACKED_FIELDS}
+
+
+class Category(SavedFieldsMixin, IsPublishedCreatedAt):
     """Класс.Category"""
 
+    TRACKED_FIELDS = ('is_published',)
+
     title = models.CharField(
         'Заголовок',
         max_length=256
@@ -68,7 +101,25 @@ class Location(IsPublishedCreatedAt):
         return self.name
 
 
-class Post(IsPublishedCreatedAt):
+class PostManager(models.Manager):
+    """Класс.PostManager"""
+
+    def recount_comments(self, post_ids=None):
+        """Пересчитать comment_count одним UPDATE с подзапросом."""
+        queryset = self.get_queryset()
+        if post_ids is not None:
+            queryset = queryset.filter(pk__in=post_ids)
+        counts = Comment.objects.filter(
+            post=OuterRef('pk')
+        ).order_by().values('post').annotate(
+            total=Count('pk')
+        ).values('total')
+        return queryset.update(
+            comment_count=Coalesce(Subquery(counts), 0)
+        )
+
+
+class Post(SavedFieldsMixin, IsPublishedCreatedAt):
     """Класс.Post"""
 
     title = models.CharField(
@@ -106,16 +157,80 @@ class Post(IsPublishedCreatedAt):
         null=True,
     )
     image = models.ImageField('Фото', upload_to='post_images', blank=True)
+    # Уменьшенные копии изображения, см. blog.images.
+    image_variants = models.JSONField(
+        'Копии изображения',
+        default=dict,
+        blank=True,
+        editable=False,
+    )
+    comment_count = models.PositiveIntegerField(
+        'Количество комментариев',
+        default=0,
+        editable=False,
+    )
+
+    objects = PostManager()
 
     class Meta:
         verbose_name = "публикация"
         verbose_name_plural = "Публикации"
         default_related_name = "posts"
         ordering = (settings.SORT_VALUE,)
+        # Индексы под ленты: главная, категория и профиль автора.
+        # Поля по возрастанию: обратный обход индекса отдаёт
+        # (pub_date DESC, id DESC) без сортировки во временном B-tree.
+        indexes = (
+            models.Index(
+                fields=('pub_date',),
+                condition=models.Q(is_published=True),
+                name='post_feed_idx',
+            ),
+            models.Index(
+                fields=('category', 'pub_date'),
+                condition=models.Q(is_published=True),
+                name='post_category_feed_idx',
+            ),
+            models.Index(
+                fields=('author', 'pub_date'),
+                name='post_author_feed_idx',
+            ),
+        )
+
+    # От этих полей зависят UserStats автора и счётчики лент.
+    TRACKED_FIELDS = ('author_id', 'is_published', 'pub_date', 'category_id')
+
+    # Меняются только через F() в сигналах и recount_comments():
+    # обычное сохранение не должно затирать их устаревшим значением.
+    SIGNAL_FIELDS = ('comment_count',)
 
     def __str__(self):
         return self.title
 
+    def save(self, *args, **kwargs):
+        if (
+            not args
+            and not self._state.adding
+            and self.pk is not None
+            and not kwargs.get('force_insert')
+            and kwargs.get('update_fields') is None
+        ):
+            deferred = self.get_deferred_fields()
+            kwargs['update_fields'] = [
+                field.attname for field in self._meta.concrete_fields
+                if not field.primary_key
+                and field.attname not in deferred
+                and field.name not in self.SIGNAL_FIELDS
+            ]
+        super().save(*args, **kwargs)
+
+    @property
+    def image_pending(self):
+        """Фото загружено, но ещё не обработано (см. ImageJob)."""
+        return bool(self.image) and (
+            self.image_variants.get('source') != self.image.name
+        )
+
 
 class Comment(IsPublishedCreatedAt):
     text = models.TextField('Текст',)
@@ -133,6 +248,260 @@ class Comment(IsPublishedCreatedAt):
         verbose_name_plural = "Комментарии"
         default_related_name = "comments"
         ordering = ("created_at",)
+        indexes = (
+            models.Index(
+                fields=('post', 'created_at'),
+                name='comment_post_created_idx',
+            ),
+        )
 
     def __str__(self):
         return f"Комментарий {self.author}"
+
+
+def _count(queryset, field):
+    """Подзапрос: число строк queryset, сгруппированных по field."""
+    return Coalesce(Subquery(
+        queryset.order_by().values(field).annotate(
+            total=Count('pk')
+        ).values('total')
+    ), 0)
+
+
+def _latest(queryset, field):
+    return Subquery(
+        queryset.order_by().values(field).annotate(
+            latest=Max('created_at')
+        ).values('latest')
+    )
+
+
+class UserStatsManager(models.Manager):
+    """Класс.UserStatsManager"""
+
+    def rebuild(self, user_ids=None):
+        """Пересчитать статистику одним UPDATE с подзапросами.
+
+        Недостающие строки создаются; возвращает число обновлённых.
+        Список user_ids обрабатывается порциями: у SQLite есть предел
+        числа параметров запроса.
+        """
+        if user_ids is not None and len(user_ids) > 500:
+            user_ids = list(user_ids)
+            return sum(
+                self.rebuild(user_ids[start:start + 500])
+                for start in range(0, len(user_ids), 500)
+            )
+        # Недостающие строки ищутся в базе для записи: реплика может
+        # ещё не получить только что созданные.
+        db = router.db_for_write(self.model)
+        users = User.objects.db_manager(db).all()
+        if user_ids is not None:
+            users = users.filter(pk__in=user_ids)
+        missing = users.filter(stats__isnull=True).values_list(
+            'pk', flat=True
+        )
+        self.bulk_create(
+            (self.model(user_id=pk) for pk in missing.iterator()),
+            batch_size=500,
+            ignore_conflicts=True,
+        )
+        stats = self.get_queryset()
+        if user_ids is not None:
+            stats = stats.filter(user_id__in=user_ids)
+        posts = Post.objects.filter(author=OuterRef('user_id'))
+        written = Comment.objects.filter(author=OuterRef('user_id'))
+        received = Comment.objects.filter(post__author=OuterRef('user_id'))
+        last_post = _latest(posts, 'author')
+        last_comment = _latest(written, 'author')
+        return stats.update(
+            published_posts=_count(posts.filter(is_published=True), 'author'),
+            total_posts=_count(posts, 'author'),
+            comments_written=_count(written, 'author'),
+            comments_received=_count(received, 'post__author'),
+            # GREATEST с NULL даёт NULL: пустую сторону заменяет другая.
+            last_activity=Greatest(
+                Coalesce(last_post, last_comment),
+                Coalesce(last_comment, last_post),
+            ),
+        )
+
+    def change(self, user_id, active_at=None, **deltas):
+        """Сдвинуть счётчики пользователя на deltas одним UPDATE.
+
+        user_id — id или подзапрос. last_activity только растёт:
+        удаление не отменяет прошлую активность. Строки без статистики
+        не трогаются: её построит for_user() при первом показе.
+        """
+        values = {
+            name: Greatest(F(name) + delta, 0)
+            for name, delta in deltas.items() if delta
+        }
+        if active_at is not None:
+            values['last_activity'] = Greatest(
+                Coalesce(F('last_activity'), active_at), active_at
+            )
+        if values:
+            self.filter(user_id=user_id).update(**values)
+
+    def for_user(self, user):
+        """Статистика пользователя; строится при первом обращении.
+
+        Без запроса, если user загружен с select_related('stats').
+        """
+        try:
+            return user.stats
+        except self.model.DoesNotExist:
+            self.rebuild([user.pk])
+            # Только что записанная строка — с основной базы, не с реплики.
+            return self.db_manager(
+                router.db_for_write(self.model)
+            ).get(user=user)
+
+
+class UserStats(models.Model):
+    """Счётчики профиля пользователя, обновляемые сигналами."""
+
+    user = models.OneToOneField(
+        User,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='stats',
+        verbose_name='Пользователь',
+    )
+    published_posts = models.PositiveIntegerField(
+        'Опубликовано публикаций', default=0
+    )
+    total_posts = models.PositiveIntegerField('Всего публикаций', default=0)
+    comments_written = models.PositiveIntegerField(
+        'Написано комментариев', default=0
+    )
+    comments_received = models.PositiveIntegerField(
+        'Получено комментариев', default=0
+    )
+    last_activity = models.DateTimeField(
+        'Последняя активность', null=True, blank=True
+    )
+
+    objects = UserStatsManager()
+
+    class Meta:
+        verbose_name = 'статистика пользователя'
+        verbose_name_plural = 'Статистика пользователей'
+
+    def __str__(self):
+        return f'Статистика {self.user_id}'
+
+
+class ImageJobManager(models.Manager):
+    """Класс.ImageJobManager"""
+
+    def enqueue(self, post):
+        """Поставить в очередь обработку текущего фото публикации."""
+        job, _ = self.get_or_create(
+            post=post,
+            source=post.image.name,
+            status__in=(ImageJob.PENDING, ImageJob.RUNNING),
+            defaults={'status': ImageJob.PENDING},
+        )
+        return job
+
+    def claim(self):
+        """Взять следующую готовую к запуску задачу.
+
+        Задача захватывается условным UPDATE: из нескольких
+        обработчиков его выполнит только один.
+        """
+        now = timezone.now()
+        candidates = self.filter(
+            status=ImageJob.PENDING, run_after__lte=now
+        ).order_by('run_after', 'id').values_list('pk', flat=True)
+        for pk in candidates[:10]:
+            claimed = self.filter(pk=pk, status=ImageJob.PENDING).update(
+                status=ImageJob.RUNNING,
+                attempts=F('attempts') + 1,
+                locked_at=now,
+            )
+            if not claimed:
+                continue
+            # Публикацию могли удалить вместе с задачей.
+            job = self.select_related('post').filter(pk=pk).first()
+            if job is not None:
+                return job
+        return None
+
+    def requeue_stale(self):
+        """Вернуть в очередь задачи упавших обработчиков."""
+        return self.filter(
+            status=ImageJob.RUNNING,
+            locked_at__lt=timezone.now() - timedelta(
+                seconds=settings.IMAGE_JOB_TIMEOUT
+            ),
+        ).update(status=ImageJob.PENDING, locked_at=None)
+
+
+class ImageJob(models.Model):
+    """Задача фоновой обработки фото публикации."""
+
+    PENDING = 'pending'
+    RUNNING = 'running'
+    DONE = 'done'
+    DEAD = 'dead'
+    STATUSES = (
+        (PENDING, 'В очереди'),
+        (RUNNING, 'Выполняется'),
+        (DONE, 'Готово'),
+        (DEAD, 'Ошибка'),
+    )
+
+    post = models.ForeignKey(
+        Post, on_delete=models.CASCADE,
+        verbose_name='Публикация',
+    )
+    source = models.CharField('Файл', max_length=255)
+    status = models.CharField(
+        'Статус', max_length=16, choices=STATUSES, default=PENDING
+    )
+    attempts = models.PositiveSmallIntegerField('Попыток', default=0)
+    run_after = models.DateTimeField('Запустить после', default=timezone.now)
+    locked_at = models.DateTimeField('Захвачена', null=True, blank=True)
+    last_error = models.TextField('Последняя ошибка', blank=True)
+    created_at = models.DateTimeField('Добавлено', auto_now_add=True)
+
+    objects = ImageJobManager()
+
+    class Meta:
+        verbose_name = 'обработка фото'
+        verbose_name_plural = 'Обработка фото'
+        default_related_name = 'image_jobs'
+        indexes = (
+            models.Index(
+                fields=('run_after', 'id'),
+                condition=models.Q(status='pending'),
+                name='imagejob_pending_idx',
+            ),
+        )
+
+    def __str__(self):
+        return f'{self.source} ({self.get_status_display()})'
+
+    def complete(self):
+        self.status = self.DONE
+        self.locked_at = None
+        self.save(update_fields=('status', 'locked_at'))
+
+    def fail(self, error, permanent=False):
+        """Отложить повтор с экспоненциальной задержкой или сдаться."""
+        self.last_error = error
+        self.locked_at = None
+        if permanent or self.attempts >= settings.IMAGE_JOB_MAX_ATTEMPTS:
+            self.status = self.DEAD
+        else:
+            self.status = self.PENDING
+            self.run_after = timezone.now() + timedelta(
+                seconds=settings.IMAGE_JOB_RETRY_DELAY
+                * 2 ** (self.attempts - 1)
+            )
+        self.save(update_fields=(
+            'status', 'run_after', 'locked_at', 'last_error'
+        ))
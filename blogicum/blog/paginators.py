@@ -0,0 +1,171 @@
+import base64
+import json
+from collections.abc import Sequence
+from datetime import date
+
+from django.core.paginator import Paginator
+from django.db.models import Q
+from django.http import Http404
+from django.utils.functional import cached_property
+
+from .counts import get_feed_count
+
+
+class CursorPage(Sequence):
+    """Страница курсорной пагинации: без номера и общего количества."""
+
+    cursor_based = True
+
+    def __init__(self, object_list, next_cursor=None, previous_cursor=None):
+        self.object_list = object_list
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __getitem__(self, index):
+        return self.object_list[index]
+
+    def has_next(self):
+        return self.next_cursor is not None
+
+    def has_previous(self):
+        return self.previous_cursor is not None
+
+    def has_other_pages(self):
+        return self.has_next() or self.has_previous()
+
+
+class CursorPaginator:
+    """Keyset-пагинация по набору полей с общим направлением сортировки.
+
+    Курсор — непрозрачный токен со значениями полей сортировки
+    крайнего объекта страницы, поэтому страница любой глубины
+    выбирается одним индексным запросом без OFFSET и COUNT(*).
+    """
+
+    def __init__(self, queryset, per_page, ordering=('-pub_date', '-id')):
+        self.queryset = queryset
+        self.per_page = int(per_page)
+        self.ordering = ordering
+        self.descending = ordering[0].startswith('-')
+        self.fields = [name.lstrip('-') for name in ordering]
+
+    def encode_cursor(self, obj, backwards=False):
+        values = [getattr(obj, name) for name in self.fields]
+        # isoformat() сохраняет микросекунды, иначе сравнение по ключу
+        # пропустит записи с одинаковой до миллисекунд датой.
+        values = [
+            value.isoformat() if isinstance(value, date) else value
+            for value in values
+        ]
+        payload = json.dumps({'v': values, 'b': backwards})
+        token = base64.urlsafe_b64encode(payload.encode()).decode()
+        return token.rstrip('=')
+
+    def to_python(self, name, value):
+        return self.queryset.model._meta.get_field(name).to_python(value)
+
+    def decode_cursor(self, cursor):
+        try:
+            padding = '=' * (-len(cursor) % 4)
+            payload = json.loads(
+                base64.urlsafe_b64decode((cursor + padding).encode())
+            )
+            values = [
+                self.to_python(name, value)
+                for name, value in zip(self.fields, payload['v'])
+            ]
+            backwards = bool(payload['b'])
+        except (ValueError, TypeError, KeyError, AttributeError):
+            raise Http404('Некорректный курсор')
+        if len(values) != len(self.fields) or None in values:
+            raise Http404('Некорректный курсор')
+        return values, backwards
+
+    def _seek(self, values, backwards):
+        lookup = 'lt' if self.descending != backwards else 'gt'
+        condition = Q()
+        for index, name in enumerate(self.fields):
+            step = Q(**{f'{name}__{lookup}': values[index]})
+            for previous, value in zip(self.fields[:index], values[:index]):
+                step &= Q(**{previous: value})
+            condition |= step
+        return condition
+
+    def page(self, cursor=None):
+        queryset = self.queryset
+        backwards = False
+        if cursor:
+            values, backwards = self.decode_cursor(cursor)
+            queryset = queryset.filter(self._seek(values, backwards))
+        ordering = self.ordering
+        if backwards:
+            ordering = [
+                name[1:] if name.startswith('-') else f'-{name}'
+                for name in ordering
+            ]
+        rows = list(queryset.order_by(*ordering)[:self.per_page + 1])
+        has_more = len(rows) > self.per_page
+        rows = rows[:self.per_page]
+        if backwards:
+            rows.reverse()
+        if not rows:
+            return CursorPage(rows)
+        has_next = has_more if not backwards else True
+        has_previous = bool(cursor) if not backwards else has_more
+        return CursorPage(
+            rows,
+            next_cursor=(
+                self.encode_cursor(rows[-1]) if has_next else None
+            ),
+            previous_cursor=(
+                self.encode_cursor(rows[0], backwards=True)
+                if has_previous else None
+            ),
+        )
+
+
+class LimitedCountPaginator(Paginator):
+    """Пагинатор для админки без полного COUNT(*) по таблице.
+
+    Считает строки подзапросом с LIMIT: до count_limit, а для дальних
+    страниц — до строки за запрошенной страницей number. Стоимость
+    подсчёта ограничена, а к следующей странице всегда есть переход.
+    Если предел достигнут, count — нижняя оценка (estimated).
+    """
+
+    count_limit = 10000
+
+    def __init__(self, object_list, per_page, *args, number=1, **kwargs):
+        super().__init__(object_list, per_page, *args, **kwargs)
+        self.limit = max(self.count_limit, number * self.per_page + 1)
+
+    @cached_property
+    def count(self):
+        return self.object_list.order_by().values('pk')[
+            :self.limit
+        ].count()
+
+    @property
+    def estimated(self):
+        return self.count >= self.limit
+
+
+class FeedPaginator(Paginator):
+    """Пагинатор ленты с общим количеством из кэша (blog.counts).
+
+    COUNT(*) по ленте выполняется только при промахе кэша; без feed —
+    обычный подсчёт.
+    """
+
+    def __init__(self, object_list, per_page, feed=None, **kwargs):
+        super().__init__(object_list, per_page, **kwargs)
+        self.feed = feed
+
+    @cached_property
+    def count(self):
+        if self.feed is None:
+            return super().count
+        return get_feed_count(self.feed, self.object_list)
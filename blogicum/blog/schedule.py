@@ -0,0 +1,51 @@
+from django.core.cache import cache
+from django.db.models import Min
+from django.utils import timezone
+
+from .cache import COUNTS_VERSION_KEY, FEED_VERSION_KEY, bump_versions
+from .models import Post
+
+NEXT_PUBLICATION_KEY = 'schedule:next_pub_date'
+NO_PUBLICATION = 'none'
+
+
+def get_next_publication():
+    """Ближайшая отложенная pub_date среди опубликованных постов или None.
+
+    Значение хранится в кэше, пока публикации не изменятся
+    (см. blog.signals), поэтому запрос к базе выполняется редко.
+    """
+    next_pub_date = cache.get(NEXT_PUBLICATION_KEY)
+    if next_pub_date is None:
+        next_pub_date = Post.objects.filter(
+            is_published=True, pub_date__gt=timezone.now()
+        ).aggregate(next_pub_date=Min('pub_date'))['next_pub_date']
+        cache.set(NEXT_PUBLICATION_KEY, next_pub_date or NO_PUBLICATION, None)
+    if next_pub_date == NO_PUBLICATION:
+        return None
+    return next_pub_date
+
+
+def reset_next_publication():
+    cache.delete(NEXT_PUBLICATION_KEY)
+
+
+def feed_valid_until():
+    """Момент, до которого ленты и их счётчики можно брать из кэша.
+
+    Если отложенная публикация уже наступила, поколение лент
+    сменяется (FEED_VERSION_KEY) и ищется следующая публикация.
+    """
+    next_pub_date = get_next_publication()
+    while next_pub_date is not None and next_pub_date <= timezone.now():
+        bump_versions(FEED_VERSION_KEY, COUNTS_VERSION_KEY)
+        reset_next_publication()
+        next_pub_date = get_next_publication()
+    return next_pub_date
+
+
+def seconds_until_feed_changes():
+    valid_until = feed_valid_until()
+    if valid_until is None:
+        return None
+    return (valid_until - timezone.now()).total_seconds()
@@ -0,0 +1,175 @@
+import re
+from contextlib import contextmanager
+
+from django.db import connection
+from django.db.models.expressions import RawSQL
+from django.utils import timezone
+
+from .paginators import CursorPage, CursorPaginator
+
+FTS_TABLE = 'blog_post_fts'
+
+# Заголовок весомее текста при ранжировании bm25().
+RANK = f'bm25({FTS_TABLE}, 10.0, 1.0)'
+
+TRIGGERS = {
+    f'{FTS_TABLE}_ai': f'''
+        CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ai
+        AFTER INSERT ON blog_post BEGIN
+            INSERT INTO {FTS_TABLE}(rowid, title, text)
+            VALUES (new.id, new.title, new.text);
+        END
+    ''',
+    f'{FTS_TABLE}_ad': f'''
+        CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ad
+        AFTER DELETE ON blog_post BEGIN
+            INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, title, text)
+            VALUES ('delete', old.id, old.title, old.text);
+        END
+    ''',
+    f'{FTS_TABLE}_au': f'''
+        CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_au
+        AFTER UPDATE OF title, text ON blog_post BEGIN
+            INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, title, text)
+            VALUES ('delete', old.id, old.title, old.text);
+            INSERT INTO {FTS_TABLE}(rowid, title, text)
+            VALUES (new.id, new.title, new.text);
+        END
+    ''',
+}
+
+
+def is_available(using=connection):
+    return using.vendor == 'sqlite'
+
+
+def rebuild_search_index(using=connection):
+    with using.cursor() as cursor:
+        cursor.execute(
+            f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')"
+        )
+
+
+def ensure_search_triggers(using=connection):
+    """Создать триггеры синхронизации индекса, если их нет.
+
+    SQLite-бэкенд Django пересоздаёт таблицу blog_post при изменении
+    схемы, и триггеры пропадают; без них индекс мог отстать, поэтому
+    после восстановления он перестраивается.
+    """
+    with using.cursor() as cursor:
+        cursor.execute(
+            "SELECT name FROM sqlite_master WHERE type = 'table' "
+            "AND name = %s",
+            [FTS_TABLE],
+        )
+        if cursor.fetchone() is None:
+            return False
+        cursor.execute(
+            "SELECT name FROM sqlite_master WHERE type = 'trigger' "
+            "AND tbl_name = 'blog_post'"
+        )
+        existing = {row[0] for row in cursor.fetchall()}
+        missing = set(TRIGGERS) - existing
+        for name in missing:
+            cursor.execute(TRIGGERS[name])
+    if missing:
+        rebuild_search_index(using)
+    return bool(missing)
+
+
+@contextmanager
+def search_index_deferred(using=connection):
+    """Массовая загрузка без построчного обновления индекса.
+
+    Триггеры удаляются на время загрузки, затем создаются заново,
+    и индекс перестраивается одним проходом.
+    """
+    with using.cursor() as cursor:
+        for name in TRIGGERS:
+            cursor.execute(f'DROP TRIGGER IF EXISTS {name}')
+    try:
+        yield
+    finally:
+        ensure_search_triggers(using)
+
+
+def to_match_query(text):
+    """Запрос пользователя в безопасное выражение MATCH.
+
+    Каждое слово берётся в кавычки (операторы FTS5 не действуют),
+    последнее ищется по префиксу.
+    """
+    words = re.findall(r'\w+', text)
+    if not words:
+        return ''
+    terms = [f'"{word}"' for word in words]
+    terms[-1] += '*'
+    return ' '.join(terms)
+
+
+def matching_post_ids(text):
+    """Подзапрос id публикаций для фильтра pk__in (без ранжирования)."""
+    return RawSQL(
+        f'SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s',
+        [to_match_query(text)],
+    )
+
+
+class SearchPaginator(CursorPaginator):
+    """Keyset-пагинация результатов поиска по (ранг bm25, id).
+
+    Только вперёд: ранг вычисляется в запросе, индекса по нему нет.
+    """
+
+    def __init__(self, queryset, per_page, text):
+        super().__init__(queryset, per_page, ordering=('rank', 'id'))
+        self.match = to_match_query(text)
+
+    def to_python(self, name, value):
+        if name == 'rank':
+            return float(value)
+        return super().to_python(name, value)
+
+    def _ranked_rows(self, after):
+        sql = [
+            f'SELECT p.id, {RANK} FROM {FTS_TABLE}',
+            f'JOIN blog_post p ON p.id = {FTS_TABLE}.rowid',
+            'JOIN blog_category c ON c.id = p.category_id',
+            f'WHERE {FTS_TABLE} MATCH %s AND p.is_published',
+            'AND c.is_published AND p.pub_date <= %s',
+        ]
+        params = [
+            self.match,
+            connection.ops.adapt_datetimefield_value(timezone.now()),
+        ]
+        if after is not None:
+            sql.append(
+                f'AND ({RANK} > %s OR ({RANK} = %s AND p.id > %s))'
+            )
+            params += [after[0], after[0], after[1]]
+        sql.append(f'ORDER BY {RANK}, p.id LIMIT %s')
+        params.append(self.per_page + 1)
+        with connection.cursor() as cursor:
+            cursor.execute(' '.join(sql), params)
+            return cursor.fetchall()
+
+    def page(self, cursor=None):
+        if not self.match:
+            return CursorPage([])
+        after = None
+        if cursor:
+            after, _ = self.decode_cursor(cursor)
+        rows = self._ranked_rows(after)
+        has_next = len(rows) > self.per_page
+        rows = rows[:self.per_page]
+        posts = self.queryset.in_bulk([pk for pk, _ in rows])
+        object_list = []
+        for pk, rank in rows:
+            if pk in posts:
+                posts[pk].rank = rank
+                object_list.append(posts[pk])
+        next_cursor = None
+        if has_next and object_list:
+            next_cursor = self.encode_cursor(object_list[-1])
+        return CursorPage(object_list, next_cursor=next_cursor)
@@ -0,0 +1,186 @@
+from django.contrib.auth import get_user_model
+from django.db.models import DEFERRED, F, Subquery
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .cache import (
+    CATEGORIES_VERSION_KEY, FEED_VERSION_KEY, bump_versions, version_key)
+from .counts import category_visibility_changed, post_changed, reset_counts
+from .images import save_image_variants
+from .models import Category, Comment, ImageJob, Location, Post, UserStats
+from .schedule import feed_valid_until, reset_next_publication
+
+User = get_user_model()
+
+
+@receiver(post_save, sender=Comment)
+def increment_comment_count(sender, instance, created, raw, **kwargs):
+    if created and not raw:
+        Post.objects.filter(pk=instance.post_id).update(
+            comment_count=F('comment_count') + 1
+        )
+
+
+@receiver(post_delete, sender=Comment)
+def decrement_comment_count(sender, instance, **kwargs):
+    # Срабатывает и при удалении через QuerySet.delete() / админку.
+    Post.objects.filter(
+        pk=instance.post_id, comment_count__gt=0
+    ).update(comment_count=F('comment_count') - 1)
+
+
+@receiver(post_save, sender=Post)
+def enqueue_image_processing(sender, instance, raw, **kwargs):
+    # Фото обрабатывает process_image_jobs вне запроса; до тех пор
+    # шаблон показывает заглушку.
+    if raw:
+        return
+    if instance.image_pending:
+        ImageJob.objects.enqueue(instance)
+    elif not instance.image and instance.image_variants:
+        save_image_variants(instance, {})
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_delete, sender=Post)
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+@receiver(post_save, sender=Location)
+@receiver(post_delete, sender=Location)
+def invalidate_object_version(sender, instance, **kwargs):
+    keys = [version_key(sender._meta.model_name, instance.pk)]
+    if sender in (Post, Category):
+        # Состав и порядок лент зависят от публикаций и категорий.
+        keys.append(FEED_VERSION_KEY)
+    if sender is Category:
+        keys.append(CATEGORIES_VERSION_KEY)
+    if sender is Post:
+        # Наступившую отложенную публикацию учитываем до сброса: после
+        # него feed_valid_until() видит только будущие даты и не сменит
+        # поколение счётчиков лент.
+        feed_valid_until()
+        reset_next_publication()
+    bump_versions(*keys)
+
+
+@receiver(post_save, sender=Comment)
+@receiver(post_delete, sender=Comment)
+def invalidate_comment_post_version(sender, instance, **kwargs):
+    bump_versions(version_key('post', instance.post_id))
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def invalidate_user_version(sender, instance, update_fields=None, **kwargs):
+    # Вход в систему обновляет только last_login — карточки не меняются.
+    if update_fields and set(update_fields) <= {'last_login'}:
+        return
+    bump_versions(version_key('user', instance.pk))
+
+
+@receiver(post_save, sender=User)
+def create_user_stats(sender, instance, created, raw, **kwargs):
+    if created and not raw:
+        UserStats.objects.get_or_create(user=instance)
+
+
+@receiver(post_save, sender=Post)
+def update_author_stats(sender, instance, created, raw, **kwargs):
+    if raw:
+        return
+    saved = getattr(instance, 'saved_fields', None)
+    if created or saved is None or DEFERRED in saved.values():
+        UserStats.objects.change(
+            instance.author_id,
+            active_at=instance.created_at if created else None,
+            total_posts=1 if created else 0,
+            published_posts=int(created and instance.is_published),
+        )
+    elif saved['author_id'] != instance.author_id:
+        # Публикация переходит к другому автору вместе с комментариями.
+        for author_id, sign, published in (
+            (saved['author_id'], -1, saved['is_published']),
+            (instance.author_id, 1, instance.is_published),
+        ):
+            UserStats.objects.change(
+                author_id,
+                total_posts=sign,
+                published_posts=sign * int(bool(published)),
+                comments_received=sign * instance.comment_count,
+            )
+    elif saved['is_published'] != instance.is_published:
+        UserStats.objects.change(
+            instance.author_id,
+            published_posts=1 if instance.is_published else -1,
+        )
+
+
+@receiver(post_delete, sender=Post)
+def decrement_author_stats(sender, instance, **kwargs):
+    UserStats.objects.change(
+        instance.author_id,
+        total_posts=-1,
+        published_posts=-int(instance.is_published),
+    )
+
+
+@receiver(post_save, sender=Comment)
+@receiver(post_delete, sender=Comment)
+def update_comment_stats(sender, instance, raw=False, created=None,
+                         **kwargs):
+    # Изменение текста комментария счётчики не меняет.
+    if raw or created is False:
+        return
+    delta = 1 if created else -1
+    UserStats.objects.change(
+        instance.author_id,
+        active_at=instance.created_at if created else None,
+        comments_written=delta,
+    )
+    UserStats.objects.change(
+        Subquery(
+            Post.objects.filter(pk=instance.post_id).values('author_id')
+        ),
+        comments_received=delta,
+    )
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_delete, sender=Post)
+def update_feed_counts(sender, instance, created=False, raw=False,
+                       **kwargs):
+    if raw:
+        return
+    saved = getattr(instance, 'saved_fields', None)
+    if kwargs['signal'] is post_delete:
+        post_changed(saved or instance.tracked_fields(), None)
+    elif created:
+        post_changed(None, instance.tracked_fields())
+    elif saved is None:
+        reset_counts()
+    else:
+        post_changed(saved, instance.tracked_fields())
+
+
+@receiver(post_save, sender=Category)
+def update_category_counts(sender, instance, created, raw, **kwargs):
+    saved = getattr(instance, 'saved_fields', None)
+    if raw or created:
+        return
+    if saved is None:
+        reset_counts()
+    elif saved['is_published'] != instance.is_published:
+        category_visibility_changed(instance)
+
+
+@receiver(post_delete, sender=Category)
+def reset_counts_on_category_delete(sender, instance, **kwargs):
+    # Публикации остались без категории (SET_NULL) — пересчёт.
+    reset_counts()
+
+
+# Последние обработчики: следующее сохранение сравнивается с этим.
+@receiver(post_save, sender=Post)
+@receiver(post_save, sender=Category)
+def remember_saved_fields(sender, instance, **kwargs):
+    instance.remember_saved_fields()
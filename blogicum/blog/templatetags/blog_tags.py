@@ -0,0 +1,44 @@
+from django import template
+
+from blog.cache import get_post_cards
+
+register = template.Library()
+
+
+@register.simple_tag
+def post_card(post):
+    """Карточка публикации из кэша фрагментов."""
+    card = getattr(post, 'card_html', None)
+    if card is None:
+        card = get_post_cards([post])[post.pk]
+    return card
+
+
+@register.inclusion_tag('includes/post_image.html')
+def post_image(post, sizes='(max-width: 40rem) 100vw, 40rem', lazy=True):
+    """Изображение публикации: <picture> с копиями разной ширины."""
+    variants = post.image_variants.get('variants')
+    context = {'post': post, 'variants': variants, 'lazy': lazy}
+    if not variants:
+        return context
+    url = post.image.storage.url
+    context.update(
+        sizes=sizes,
+        webp_srcset=', '.join(
+            f"{url(variant['webp'])} {variant['width']}w"
+            for variant in variants if 'webp' in variant
+        ),
+        jpeg_srcset=', '.join(
+            f"{url(variant['jpeg'])} {variant['width']}w"
+            for variant in variants
+        ),
+        # Для браузеров без srcset — копия не уже карточки (40rem).
+        src=url(next(
+            (variant['jpeg'] for variant in variants
+             if variant['width'] >= 640),
+            variants[-1]['jpeg'],
+        )),
+        width=post.image_variants['width'],
+        height=post.image_variants['height'],
+    )
+    return context
@@ -11,6 +11,16 @@ urlpatterns = [
         views.PostCategoryView.as_view(),
         name='category_posts'
     ),
+    path(  # поиск
+        'search/',
+        views.PostSearchView.as_view(),
+        name='search'
+    ),
+    path(  # выгрузка для персонала
+        'export/',
+        views.ExportView.as_view(),
+        name='export'
+    ),
     path(  # профиль пользователь
         'profile/<str:username>/',
         views.ProfileListView.as_view(),
@@ -26,6 +36,11 @@ urlpatterns = [
         views.PostDetailView.as_view(),
         name='post_detail'
     ),
+    path(  # комментарии публикации, следующая страница
+        'posts/<int:post_id>/comments/',
+        views.PostCommentsView.as_view(),
+        name='post_comments'
+    ),
     path(  # публикация добавить
         'posts/create/',
         views.PostCreateView.as_view(),
@@ -1,16 +1,27 @@
+from http import HTTPStatus
+from urllib.parse import urlencode
+
 from django.utils import timezone
 from django.shortcuts import redirect, get_object_or_404
-from django.db.models import Count
 from django.urls import reverse, reverse_lazy
 from django.views.generic import (
-    DetailView, CreateView, ListView, UpdateView, DeleteView)
-from django.contrib.auth.mixins import LoginRequiredMixin
+    DetailView, CreateView, ListView, UpdateView, DeleteView, View)
+from django.contrib.auth.mixins import LoginRequiredMixin, UserPassesTestMixin
 from django.contrib.auth.models import User
-from django.http import Http404
+from django.http import Http404, HttpResponseBadRequest, StreamingHttpResponse
 from django.conf import settings
 
+from blogicum.routers import read_from_primary
+from .cache import (
+    FEED_VERSION_KEY, get_cached_page, get_post_cards, posts_dependencies,
+    set_cached_page, version_key)
+from .categories import get_published_category
+from .export import FIELDS, export_lines, export_records, parse_since
 from .forms import CommentForm, PostForm
-from .models import Post, Category, Comment
+from .models import Post, Comment, UserStats
+from .paginators import CursorPaginator, FeedPaginator
+from .schedule import seconds_until_feed_changes
+from .search import SearchPaginator
 
 
 class PostQuerySet:
@@ -28,55 +39,164 @@ class PostQuerySet:
         ).order_by(settings.SORT_VALUE).all()
 
 
-class PostCategoryView(PostQuerySet, ListView):
+class PostPaginationMixin:
+    paginate_by = settings.DISPLAY_POSTS
+    paginator_class = FeedPaginator
+    # Лента для кэшированного счётчика публикаций (см. blog.counts).
+    count_feed = None
+
+    def get_count_feed(self):
+        return self.count_feed
+
+    def get_paginator(self, queryset, per_page, **kwargs):
+        return super().get_paginator(
+            queryset, per_page, feed=self.get_count_feed(), **kwargs
+        )
+
+    def paginate_queryset(self, queryset, page_size):
+        if not settings.CURSOR_PAGINATION:
+            return super().paginate_queryset(queryset, page_size)
+        page = CursorPaginator(queryset, page_size).page(
+            self.request.GET.get('cursor')
+        )
+        return None, page, page.object_list, page.has_other_pages()
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        page = context['page_obj']
+        if context['is_paginated'] and not getattr(
+            page, 'cursor_based', False
+        ):
+            # Окно номеров вокруг текущей страницы с «…» по краям,
+            # а не ссылка на каждую из тысяч страниц ленты.
+            context['page_range'] = list(
+                page.paginator.get_elided_page_range(
+                    page.number,
+                    on_each_side=settings.PAGINATOR_ON_EACH_SIDE,
+                    on_ends=settings.PAGINATOR_ON_ENDS,
+                )
+            )
+        posts = list(page)
+        cards = get_post_cards(posts)
+        for post in posts:
+            post.card_html = cards[post.pk]
+        return context
+
+
+class AnonymousPageCacheMixin:
+    """Кэш страницы целиком для анонимных читателей.
+
+    Запись хранит метки версий объектов, показанных на странице, и
+    отбрасывается при смене любой из них (см. blog.signals).
+    """
+
+    def get_page_dependencies(self, context):
+        return [FEED_VERSION_KEY] + posts_dependencies(context['page_obj'])
+
+    def get_page_cache_timeout(self):
+        return settings.PAGE_CACHE_TIMEOUT
+
+    def dispatch(self, request, *args, **kwargs):
+        if request.method != 'GET' or request.user.is_authenticated:
+            return super().dispatch(request, *args, **kwargs)
+        response = get_cached_page(request)
+        if response is not None:
+            return response
+        # Страница ляжет в кэш под текущими метками версий, поэтому
+        # рисуется с основной базы: отставшая реплика закрепила бы в
+        # кэше уже изменённые данные.
+        read_from_primary()
+        response = super().dispatch(request, *args, **kwargs)
+        if response.status_code == HTTPStatus.OK:
+            response.add_post_render_callback(
+                lambda rendered: set_cached_page(
+                    request,
+                    rendered,
+                    self.get_page_dependencies(rendered.context_data),
+                    self.get_page_cache_timeout(),
+                )
+            )
+        return response
+
+
+class FeedPageCacheMixin(AnonymousPageCacheMixin):
+    def dispatch(self, request, *args, **kwargs):
+        # Наступившая отложенная публикация сменяет поколение лент
+        # до поиска страницы в кэше.
+        self.feed_ttl = seconds_until_feed_changes()
+        return super().dispatch(request, *args, **kwargs)
+
+    def get_page_cache_timeout(self):
+        timeout = super().get_page_cache_timeout()
+        if self.feed_ttl is None:
+            return timeout
+        return min(timeout, int(self.feed_ttl))
+
+
+class PostCategoryView(FeedPageCacheMixin, PostQuerySet, PostPaginationMixin,
+                       ListView):
+    use_replica = True
     template_name = 'blog/category.html'
     context_object_name = 'post_list'
-    paginate_by = settings.DISPLAY_POSTS
     category = None
 
     def get_queryset(self):
-        self.category = get_object_or_404(
-            Category,
-            slug=self.kwargs['category_slug'],
-            is_published=True
-        )
-        return super().get_queryset().filter(
-            category__slug=self.kwargs['category_slug']
-        )
+        self.category = get_published_category(self.kwargs['category_slug'])
+        if self.category is None:
+            raise Http404('Страница не найдена')
+        return super().get_queryset().filter(category_id=self.category.pk)
+
+    def get_count_feed(self):
+        return f'category:{self.category.pk}'
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         context['category'] = self.category
         return context
 
+    def get_page_dependencies(self, context):
+        return super().get_page_dependencies(context) + [
+            version_key('category', self.category.pk)
+        ]
 
-class ProfileListView(PostQuerySet, ListView):
-    paginate_by = settings.DISPLAY_POSTS
+
+class ProfileListView(PostQuerySet, PostPaginationMixin, ListView):
+    use_replica = True
     template_name = 'blog/profile.html'
     model = Post
 
     def get_object(self):
-        return get_object_or_404(User, username=self.kwargs['username'])
+        # Профиль со статистикой загружается один раз за запрос.
+        if not hasattr(self, 'profile'):
+            self.profile = get_object_or_404(
+                User.objects.select_related('stats'),
+                username=self.kwargs['username']
+            )
+        return self.profile
 
     def get_queryset(self):
-        queryset = Post.objects
-        self.profile = get_object_or_404(User,
-                                         username=self.kwargs['username'])
-
-        queryset = queryset.filter(
-            author=self.profile
-        ).annotate(comment_count=Count('comments')).order_by(
-            settings.SORT_VALUE)
-        if self.request.user != self.profile:
-            queryset = super().get_queryset().annotate(
-                comment_count=Count('comments'))
-
-        return queryset
+        profile = self.get_object()
+        if self.request.user == profile:
+            # Автор видит и черновики, и отложенные публикации.
+            queryset = Post.objects.select_related(
+                'author', 'location', 'category'
+            ).order_by(settings.SORT_VALUE)
+        else:
+            queryset = super().get_queryset()
+        # Фильтр по автору — индекс post_author_feed_idx.
+        return queryset.filter(author=profile)
+
+    def get_count_feed(self):
+        if self.request.user == self.profile:
+            return f'author:{self.profile.pk}:all'
+        return f'author:{self.profile.pk}'
 
     def get_context_data(self, **kwargs):
+        profile = self.get_object()
         return dict(
             **super().get_context_data(**kwargs),
-            profile=self.get_object()
+            profile=profile,
+            stats=UserStats.objects.for_user(profile)
         )
 
 
@@ -95,23 +215,54 @@ class ProfileUpdateView(LoginRequiredMixin, UpdateView):
         )
 
 
-class PostDetailView(DetailView):
+class PostObjectMixin:
     model = Post
-    template_name = 'blog/detail.html'
     pk_url_kwarg = 'post_id'
 
+    def get_queryset(self):
+        return Post.objects.select_related('author', 'location', 'category')
+
+    def get_object(self, queryset=None):
+        # Пост загружается один раз за запрос: проверка прав в dispatch,
+        # get()/post() представления и шаблон используют один экземпляр.
+        if getattr(self, 'object', None) is None:
+            self.object = super().get_object(queryset)
+        return self.object
+
+
+class PostDetailView(AnonymousPageCacheMixin, PostObjectMixin, DetailView):
+    use_replica = True
+    template_name = 'blog/detail.html'
+
     def get_context_data(self, **kwargs):
+        comments = CursorPaginator(
+            self.object.comments.select_related('author'),
+            settings.DISPLAY_COMMENTS,
+            ordering=('created_at', 'id'),
+        ).page(self.request.GET.get('cursor'))
         return dict(
             **super().get_context_data(**kwargs),
             form=CommentForm(),
-            comments=self.object.comments.all()
+            comments=comments
         )
 
-    def dispatch(self, request, *args, **kwargs):
-        instance = get_object_or_404(Post, pk=self.kwargs['post_id'])
+    def get_object(self, queryset=None):
+        instance = super().get_object(queryset)
         if instance.author != self.request.user and not instance.is_published:
             raise Http404('Страница не найдена')
-        return super().dispatch(request, *args, **kwargs)
+        return instance
+
+    def get_page_dependencies(self, context):
+        return posts_dependencies([self.object]) + [
+            version_key('user', comment.author_id)
+            for comment in context['comments']
+        ]
+
+
+class PostCommentsView(PostDetailView):
+    """Следующая порция комментариев для кнопки «Показать ещё»."""
+
+    template_name = 'includes/comment_list.html'
 
 
 class PostCreateView(LoginRequiredMixin, CreateView):
@@ -132,17 +283,12 @@ class PostCreateView(LoginRequiredMixin, CreateView):
         )
 
 
-class PostFormMixin:
-    model = Post
+class PostFormMixin(PostObjectMixin):
     template_name = 'blog/create.html'
     form_class = PostForm
-    pk_url_kwarg = 'post_id'
 
     def dispatch(self, request, *args, **kwargs):
-        post = get_object_or_404(
-            Post,
-            pk=self.kwargs['post_id']
-        )
+        post = self.get_object()
         if post.author != self.request.user:
             return redirect(
                 'blog:post_detail',
@@ -216,9 +362,67 @@ class CommentDeletView(CommentMixin, DeleteView):
     pass
 
 
-class PostListView(PostQuerySet, ListView):
-    paginate_by = settings.DISPLAY_POSTS
+class PostListView(FeedPageCacheMixin, PostQuerySet, PostPaginationMixin,
+                   ListView):
+    use_replica = True
     template_name = 'blog/index.html'
+    count_feed = 'feed'
+
+
+class PostSearchView(PostQuerySet, PostPaginationMixin, ListView):
+    template_name = 'blog/search.html'
 
     def get_queryset(self):
-        return super().get_queryset().annotate(comment_count=Count('comments'))
+        self.query = self.request.GET.get('q', '').strip()
+        return super().get_queryset()
+
+    def paginate_queryset(self, queryset, page_size):
+        page = SearchPaginator(queryset, page_size, self.query).page(
+            self.request.GET.get('cursor')
+        )
+        return None, page, page.object_list, page.has_other_pages()
+
+    def get_context_data(self, **kwargs):
+        return dict(
+            **super().get_context_data(**kwargs),
+            query=self.query,
+            cursor_query=urlencode({'q': self.query}) + '&'
+        )
+
+
+class ExportView(UserPassesTestMixin, View):
+    """Потоковая выгрузка для персонала: ?format=jsonl|csv&model=&since=."""
+
+    content_types = {
+        'jsonl': 'application/x-ndjson; charset=utf-8',
+        'csv': 'text/csv; charset=utf-8',
+    }
+
+    def test_func(self):
+        return self.request.user.is_staff
+
+    def get(self, request):
+        file_format = request.GET.get('format', 'jsonl')
+        model = request.GET.get('model') or None
+        if file_format not in self.content_types or (
+            model is not None and model not in FIELDS
+        ):
+            return HttpResponseBadRequest('Некорректный формат или модель')
+        if file_format == 'csv' and model is None:
+            return HttpResponseBadRequest('Для CSV укажите model')
+        since = None
+        if request.GET.get('since'):
+            try:
+                since = parse_since(request.GET['since'])
+            except ValueError as error:
+                return HttpResponseBadRequest(str(error))
+        records = export_records(
+            models=(model,) if model else tuple(FIELDS), since=since
+        )
+        response = StreamingHttpResponse(
+            export_lines(records, file_format, model),
+            content_type=self.content_types[file_format],
+        )
+        filename = f'blogicum-{model or "all"}.{file_format}'
+        response['Content-Disposition'] = f'attachment; filename="{filename}"'
+        return response
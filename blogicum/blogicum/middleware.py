@@ -0,0 +1,145 @@
+import json
+import logging
+import time
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.db import connections
+
+from .routers import replica_reads
+
+logger = logging.getLogger('blogicum.requests')
+
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+
+
+class QueryBudgetExceeded(Exception):
+    """Представление выполнило больше запросов, чем QUERY_BUDGETS."""
+
+
+class RequestMetrics:
+    """Счётчики одного запроса: SQL и время отрисовки шаблона."""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.queries = 0
+        self.db_time = 0.0
+        self.template_time = 0.0
+
+    def record_query(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.queries += 1
+            self.db_time += time.perf_counter() - started
+
+    def timed_render(self, render):
+        def wrapper():
+            started = time.perf_counter()
+            try:
+                return render()
+            finally:
+                self.template_time += time.perf_counter() - started
+        return wrapper
+
+
+class RequestMetricsMiddleware:
+    """Число SQL-запросов, время БД, шаблона и представления.
+
+    Метрики уходят в заголовок Server-Timing и строку JSON в журнал
+    blogicum.requests. Если у представления есть бюджет в
+    QUERY_BUDGETS и он превышен, пишется предупреждение, а при
+    QUERY_BUDGET_STRICT (в тестах) — выбрасывается QueryBudgetExceeded.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        metrics = request.metrics = RequestMetrics()
+        with ExitStack() as stack:
+            for alias in connections:
+                stack.enter_context(
+                    connections[alias].execute_wrapper(metrics.record_query)
+                )
+            response = self.get_response(request)
+        total = time.perf_counter() - metrics.started
+        match = request.resolver_match
+        view_name = match.view_name if match else None
+        if settings.SERVER_TIMING:
+            response['Server-Timing'] = ', '.join((
+                f'db;dur={metrics.db_time * 1000:.1f};'
+                f'desc="{metrics.queries} queries"',
+                f'tpl;dur={metrics.template_time * 1000:.1f}',
+                f'view;dur={(total - metrics.template_time) * 1000:.1f}',
+                f'total;dur={total * 1000:.1f}',
+            ))
+        record = {
+            'method': request.method,
+            'path': request.path,
+            'view': view_name,
+            'status': response.status_code,
+            'queries': metrics.queries,
+            'db_ms': round(metrics.db_time * 1000, 1),
+            'template_ms': round(metrics.template_time * 1000, 1),
+            'view_ms': round((total - metrics.template_time) * 1000, 1),
+            'total_ms': round(total * 1000, 1),
+        }
+        logger.info(json.dumps(record), extra={'metrics': record})
+        self.check_budget(view_name, metrics.queries)
+        return response
+
+    def process_template_response(self, request, response):
+        response.render = request.metrics.timed_render(response.render)
+        return response
+
+    def check_budget(self, view_name, queries):
+        budget = settings.QUERY_BUDGETS.get(view_name)
+        if budget is None or queries <= budget:
+            return
+        message = (
+            f'{view_name}: {queries} SQL-запросов при бюджете {budget}'
+        )
+        if settings.QUERY_BUDGET_STRICT:
+            raise QueryBudgetExceeded(message)
+        logger.warning(message)
+
+
+class ReplicaRoutingMiddleware:
+    """Чтение с реплик для представлений с атрибутом use_replica.
+
+    После запроса на запись браузер получает cookie PIN_COOKIE и
+    REPLICA_PIN_SECONDS читает с основной базы: реплика могла ещё не
+    получить его изменения.
+    """
+
+    PIN_COOKIE = 'primary_pin'
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        try:
+            response = self.get_response(request)
+        finally:
+            token = getattr(request, 'replica_token', None)
+            if token is not None:
+                replica_reads.reset(token)
+        if settings.DATABASE_REPLICAS and request.method not in SAFE_METHODS:
+            response.set_cookie(
+                self.PIN_COOKIE, '1',
+                max_age=settings.REPLICA_PIN_SECONDS,
+                httponly=True,
+                samesite='Lax',
+            )
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        view = getattr(view_func, 'view_class', view_func)
+        if (
+            request.method in SAFE_METHODS
+            and getattr(view, 'use_replica', False)
+            and self.PIN_COOKIE not in request.COOKIES
+        ):
+            request.replica_token = replica_reads.set(True)
@@ -0,0 +1,57 @@
+import random
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+
+# Чтение с реплик разрешено в текущем запросе (или блоке кода).
+replica_reads = ContextVar('replica_reads', default=False)
+
+
+@contextmanager
+def read_from_replica():
+    """Читать с реплик внутри блока, например в команде управления."""
+    token = replica_reads.set(True)
+    try:
+        yield
+    finally:
+        replica_reads.reset(token)
+
+
+def replica_in_use():
+    """Чтение в текущем запросе (блоке) идёт с реплики."""
+    return replica_reads.get() and bool(settings.DATABASE_REPLICAS)
+
+
+def read_from_primary():
+    """Читать с основной базы до конца запроса или блока.
+
+    Прежнее значение вернёт ReplicaRoutingMiddleware или
+    read_from_replica() при выходе.
+    """
+    replica_reads.set(False)
+
+
+class ReplicaRouter:
+    """Чтение с реплик DATABASE_REPLICAS, запись — в default.
+
+    Реплики используются только там, где это разрешено явно:
+    представления с use_replica = True (blogicum.middleware.
+    ReplicaRoutingMiddleware) и блоки read_from_replica(). Остальное
+    чтение идёт с основной базы, как и без маршрутизатора.
+    """
+
+    def db_for_read(self, model, **hints):
+        if replica_reads.get() and settings.DATABASE_REPLICAS:
+            return random.choice(settings.DATABASE_REPLICAS)
+        return None
+
+    def db_for_write(self, model, **hints):
+        return 'default'
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Реплики — копии default: объекты из любой базы совместимы.
+        databases = {'default', *settings.DATABASE_REPLICAS}
+        if {obj1._state.db, obj2._state.db} <= databases:
+            return True
+        return None
@@ -10,11 +10,17 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/3.2/ref/settings/
 """
 
+import os
+import tempfile
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
 
+# Профиль окружения: BLOGICUM_PROFILE=production включает настройки БД
+# для работы под нагрузкой (см. DATABASES).
+PRODUCTION = os.environ.get('BLOGICUM_PROFILE') == 'production'
+
 # Quick-start development settings - unsuitable for production
 # See https://docs.djangoproject.com/en/3.2/howto/deployment/checklist/
 
@@ -46,6 +52,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'blogicum.middleware.RequestMetricsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -53,12 +60,66 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'blogicum.middleware.ReplicaRoutingMiddleware',
 ]
 
 DISPLAY_POSTS = 10  # Пагинация.
 
+PAGINATOR_ON_EACH_SIDE = 2  # Номеров страниц по обе стороны от текущей.
+
+PAGINATOR_ON_ENDS = 1  # Номеров страниц у начала и конца списка.
+
+SERVER_TIMING = True  # Заголовок Server-Timing с метриками запроса.
+
+# Наибольшее число SQL-запросов на представление (имя маршрута),
+# с учётом сессии и пользователя и без кэша страниц.
+QUERY_BUDGETS = {
+    'blog:index': 5,
+    'blog:category_posts': 6,
+    'blog:post_detail': 4,
+    'blog:post_comments': 4,
+    'blog:search': 4,
+    'blog:profile': 5,
+}
+
+QUERY_BUDGET_STRICT = False  # Превышение бюджета — исключение (тесты).
+
+# Строка JSON с метриками каждого запроса (blogicum.middleware).
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {'class': 'logging.StreamHandler'},
+    },
+    'loggers': {
+        'blogicum.requests': {'handlers': ['console'], 'level': 'INFO'},
+    },
+}
+
+CURSOR_PAGINATION = False  # Курсорная пагинация лент (?cursor=).
+
+DISPLAY_COMMENTS = 20  # Комментариев на странице публикации.
+
 SORT_VALUE = '-pub_date'  # Сортировка постов и комментариев.
 
+POST_CARD_CACHE_TIMEOUT = 60 * 60 * 24  # Кэш карточек публикаций, сек.
+
+PAGE_CACHE_TIMEOUT = 60 * 10  # Кэш страниц для анонимных читателей, сек.
+
+PAGE_CACHE_MAX_AGE = 0  # Cache-Control: max-age для браузеров, сек.
+
+FEED_COUNT_TIMEOUT = 60 * 60  # Кэш числа публикаций в лентах, сек.
+
+POST_IMAGE_WIDTHS = (320, 640, 1280)  # Ширины копий изображений, px.
+
+POST_IMAGE_QUALITY = 80  # Качество сжатия копий WebP/JPEG.
+
+IMAGE_JOB_MAX_ATTEMPTS = 5  # Попыток обработки фото до статуса «Ошибка».
+
+IMAGE_JOB_RETRY_DELAY = 30  # Пауза перед повтором, сек.; растёт вдвое.
+
+IMAGE_JOB_TIMEOUT = 60 * 10  # Зависшая задача возвращается в очередь, сек.
+
 ROOT_URLCONF = 'blogicum.urls'
 
 EMAIL_BACKEND = 'django.core.mail.backends.filebased.EmailBackend'
@@ -95,6 +156,17 @@ TEMPLATES = [
     },
 ]
 
+if PRODUCTION:
+    # Шаблоны разбираются один раз за процесс; wsgi.py загружает их
+    # заранее (blogicum.warmup).
+    TEMPLATES[0]['APP_DIRS'] = False
+    TEMPLATES[0]['OPTIONS']['loaders'] = [
+        ('django.template.loaders.cached.Loader', [
+            'django.template.loaders.filesystem.Loader',
+            'django.template.loaders.app_directories.Loader',
+        ]),
+    ]
+
 WSGI_APPLICATION = 'blogicum.wsgi.application'
 
 
@@ -108,6 +180,71 @@ DATABASES = {
     }
 }
 
+# Настройки БД профиля production.
+PRODUCTION_DATABASE = {
+    'ENGINE': 'blogicum.sqlite',
+    'CONN_MAX_AGE': 60,  # Соединение живёт между запросами, сек.
+    'OPTIONS': {
+        'timeout': 5,  # Ожидание блокировки модулем sqlite3, сек.
+        'transaction_mode': 'IMMEDIATE',
+        'pragmas': {
+            # Читатели не ждут писателя и наоборот.
+            'journal_mode': 'WAL',
+            # В режиме WAL fsync только на контрольных точках.
+            'synchronous': 'NORMAL',
+            'busy_timeout': 5000,  # мс
+            'cache_size': -20000,  # КиБ, около 20 МБ на соединение.
+            'mmap_size': 256 * 1024 * 1024,  # байт
+            'temp_store': 'MEMORY',
+        },
+    },
+}
+
+if PRODUCTION:
+    DATABASES['default'].update(PRODUCTION_DATABASE)
+
+# Реплики только для чтения: BLOGICUM_REPLICAS — пути к копиям базы
+# через запятую. С них читают представления с use_replica = True.
+DATABASE_REPLICAS = []
+for number, name in enumerate(
+    filter(None, os.environ.get('BLOGICUM_REPLICAS', '').split(',')), 1
+):
+    DATABASES[f'replica{number}'] = {
+        **DATABASES['default'],
+        'NAME': name,
+        'TEST': {'MIRROR': 'default'},
+    }
+    DATABASE_REPLICAS.append(f'replica{number}')
+
+DATABASE_ROUTERS = ['blogicum.routers.ReplicaRouter']
+
+REPLICA_PIN_SECONDS = 5  # После записи чтение с основной базы, сек.
+
+# Метки версий (blog.cache), реестр категорий и счётчики лент
+# рассчитаны на кэш, общий для всех процессов. LocMemCache у каждого
+# процесса свой — только для разработки и тестов в одном процессе.
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    }
+}
+
+# Кэш профиля production: файлы общие для процессов одной машины.
+# При нескольких машинах нужен сетевой кэш (Redis, Memcached).
+PRODUCTION_CACHE = {
+    'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+    'LOCATION': os.environ.get(
+        'BLOGICUM_CACHE_DIR',
+        os.path.join(tempfile.gettempdir(), 'blogicum-cache'),
+    ),
+    'OPTIONS': {
+        'MAX_ENTRIES': 100000,  # Записей до вытеснения части кэша.
+    },
+}
+
+if PRODUCTION:
+    CACHES['default'] = PRODUCTION_CACHE
+
 
 # Password validation
 # https://docs.djangoproject.com/en/3.2/ref/settings/#auth-password-validators
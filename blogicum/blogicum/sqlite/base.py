@@ -0,0 +1,28 @@
+from django.db.backends.sqlite3 import base
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    """SQLite с прагмами из OPTIONS['pragmas'] и BEGIN IMMEDIATE.
+
+    Прагмы выполняются при открытии каждого соединения. Транзакция
+    сразу берёт блокировку записи: иначе две транзакции, начавшие с
+    чтения, при попытке записи получают «database is locked» без
+    ожидания busy_timeout.
+    """
+
+    def get_connection_params(self):
+        params = super().get_connection_params()
+        params.pop('pragmas', None)
+        params.pop('transaction_mode', None)
+        return params
+
+    def get_new_connection(self, conn_params):
+        conn = super().get_new_connection(conn_params)
+        options = self.settings_dict['OPTIONS']
+        for name, value in options.get('pragmas', {}).items():
+            conn.execute(f'PRAGMA {name} = {value}')
+        return conn
+
+    def _start_transaction_under_autocommit(self):
+        mode = self.settings_dict['OPTIONS'].get('transaction_mode', '')
+        self.cursor().execute(f'BEGIN {mode}'.strip())
@@ -4,10 +4,12 @@ from http import HTTPStatus
 
 
 class AboutView(TemplateView):
+    use_replica = True
     template_name = 'pages/about.html'
 
 
 class RulesView(TemplateView):
+    use_replica = True
     template_name = 'pages/rules.html'
 
 
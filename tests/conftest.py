@@ -41,6 +41,23 @@ def enable_debug_false():
         yield
 
 
+@pytest.fixture(autouse=True)
+def strict_query_budgets():
+    """Превышение QUERY_BUDGETS валит тест (см. blogicum.middleware)."""
+    with override_settings(QUERY_BUDGET_STRICT=True):
+        yield
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    """Откат транзакции теста не вызывает сигналов сброса кэша."""
+    from django.core.cache import cache
+
+    cache.clear()
+    yield
+    cache.clear()
+
+
 class SafeImportFromContextManager:
     def __init__(
             self,
@@ -363,6 +380,7 @@ def cleanup(request):
                     filename.endswith(".jpg")
                     or filename.endswith(".gif")
                     or filename.endswith(".png")
+                    or filename.endswith(".webp")
             ):
                 file_path = os.path.join(root, filename)
                 if os.path.getmtime(file_path) >= start_time:
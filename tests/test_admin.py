@@ -0,0 +1,84 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture
+def admin_user_client(client, django_user_model):
+    admin_user = django_user_model.objects.create_superuser(
+        "admin", "admin@example.com", "password"
+    )
+    client.force_login(admin_user)
+    return client
+
+
+@pytest.mark.parametrize("n_items", [3, 12])
+@pytest.mark.parametrize("model_name", ["post", "comment"])
+def test_admin_changelist_queries(
+        admin_user_client, mixer, user, published_category,
+        published_location, model_name, n_items
+):
+    posts = mixer.cycle(n_items).blend(
+        "blog.Post", author=user, category=published_category,
+        location=published_location,
+    )
+    mixer.cycle(n_items).blend(
+        "blog.Comment", author=user, post=mixer.sequence(*posts)
+    )
+    url = f"/admin/blog/{model_name}/"
+    with CaptureQueriesContext(connection) as first:
+        assert admin_user_client.get(url).status_code == 200
+    assert len(first) < 10
+    counts = [
+        query["sql"] for query in first.captured_queries
+        if "COUNT(" in query["sql"]
+    ]
+    assert counts and all("LIMIT" in sql for sql in counts), (
+        "Убедитесь, что список объектов в админке не выполняет полный"
+        f" COUNT(*):\n{counts}"
+    )
+
+    mixer.cycle(n_items).blend("blog.Post", author=user)
+    with CaptureQueriesContext(connection) as second:
+        admin_user_client.get(url)
+    assert len(second) == len(first), (
+        "Убедитесь, что число запросов списка в админке не зависит от числа"
+        " объектов на странице."
+    )
+
+
+def test_admin_post_change_form(admin_user_client, mixer, user):
+    post = mixer.blend("blog.Post", author=user)
+    mixer.cycle(5).blend("auth.User")
+    content = admin_user_client.get(
+        f"/admin/blog/post/{post.id}/change/"
+    ).content.decode("utf-8")
+    assert 'class="vForeignKeyRawIdAdminField"' in content, (
+        "Убедитесь, что автор публикации выбирается виджетом raw_id, а не"
+        " списком всех пользователей."
+    )
+
+
+def test_admin_changelist_pages_past_count_limit(
+        admin_user_client, monkeypatch, mixer, user
+):
+    from blog.admin import PostAdmin
+    from blog.paginators import LimitedCountPaginator
+
+    monkeypatch.setattr(LimitedCountPaginator, "count_limit", 5)
+    monkeypatch.setattr(PostAdmin, "list_per_page", 2)
+    mixer.cycle(12).blend("blog.Post", author=user)
+    content = admin_user_client.get("/admin/blog/post/").content.decode()
+    assert "не менее 5" in content, (
+        "Убедитесь, что число объектов, упёршееся в предел подсчёта,"
+        " показывается в админке как оценка."
+    )
+    response = admin_user_client.get("/admin/blog/post/", {"p": 6})
+    assert response.status_code == 200, (
+        "Убедитесь, что в админке можно перейти к странице за пределом"
+        " подсчёта."
+    )
+    assert len(response.context["cl"].result_list) == 2
+    assert "не менее" not in response.content.decode()
@@ -0,0 +1,287 @@
+"""Бенчмарк маршрутов blog и pages: запросы, задержка, память.
+
+Запускается отдельно от основных тестов:
+
+    BLOGICUM_BENCHMARK=1 pytest tests/test_benchmarks.py
+
+Переменные окружения:
+    BLOGICUM_BENCHMARK_SCALE — множитель объёма данных (1 — 2 000
+        пользователей, 20 000 публикаций, 40 000 комментариев);
+    BLOGICUM_BENCHMARK_ROUNDS — замеров времени на маршрут;
+    BLOGICUM_BENCHMARK_TOLERANCE — допустимый рост времени и памяти
+        относительно базы (0.5 — на 50 %);
+    BLOGICUM_BENCHMARK_UPDATE=1 — записать результаты как новую базу.
+
+Число SQL-запросов сравнивается с базой строго: оно не зависит от
+машины; время (медиана) и пик памяти — с допуском. Замер «холодный»:
+кэш очищается перед каждым запросом. База tests/benchmark_baseline.json
+снята при масштабе 1.
+"""
+import json
+import os
+import random
+import time
+import tracemalloc
+from datetime import timedelta
+from pathlib import Path
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import Client
+from django.urls import get_resolver, reverse
+from django.utils import timezone
+from mixer.backend.django import Mixer
+
+BASELINE = Path(__file__).with_name("benchmark_baseline.json")
+SCALE = float(os.environ.get("BLOGICUM_BENCHMARK_SCALE", 1))
+ROUNDS = int(os.environ.get("BLOGICUM_BENCHMARK_ROUNDS", 15))
+TOLERANCE = float(os.environ.get("BLOGICUM_BENCHMARK_TOLERANCE", 0.5))
+UPDATE = bool(os.environ.get("BLOGICUM_BENCHMARK_UPDATE"))
+
+pytestmark = [
+    pytest.mark.skipif(
+        not os.environ.get("BLOGICUM_BENCHMARK"),
+        reason="Бенчмарк включается переменной BLOGICUM_BENCHMARK=1.",
+    ),
+    pytest.mark.django_db,
+]
+
+# (маршрут, клиент): anon — аноним, author — автор данных из dataset.
+SCENARIOS = [
+    ("blog:index", "anon"),
+    ("blog:index", "author"),
+    ("blog:category_posts", "anon"),
+    ("blog:profile", "anon"),
+    ("blog:profile", "author"),
+    ("blog:search", "anon"),
+    ("blog:post_detail", "anon"),
+    ("blog:post_detail", "author"),
+    ("blog:post_comments", "anon"),
+    ("blog:create_post", "author"),
+    ("blog:edit_post", "author"),
+    ("blog:delete_post", "author"),
+    ("blog:add_comment", "author"),
+    ("blog:edit_comment", "author"),
+    ("blog:delete_comment", "author"),
+    ("blog:edit_profile", "author"),
+    ("blog:export", "author"),
+    ("pages:about", "anon"),
+    ("pages:rules", "anon"),
+]
+
+results = {}
+
+
+def _seed():
+    """Данные с перекосом: немного активных авторов и популярных постов."""
+    from blog.bulk import IdSequence, keep_auto_now
+    from blog.models import Category, Comment, Location, Post, UserStats
+
+    User = get_user_model()
+    rng = random.Random(42)
+    mixer = Mixer(commit=False)
+    now = timezone.now()
+
+    ids = IdSequence(User)
+    users = [
+        mixer.blend(User, id=ids.take(), username=f"bench{i}")
+        for i in range(int(2000 * SCALE))
+    ]
+    User.objects.bulk_create(users, batch_size=500)
+    categories = [
+        mixer.blend(Category, is_published=True, slug=f"bench-{i}")
+        for i in range(20)
+    ]
+    Category.objects.bulk_create(categories)
+    categories = list(Category.objects.filter(slug__startswith="bench-"))
+    Location.objects.bulk_create(
+        mixer.blend(Location, is_published=True) for _ in range(50)
+    )
+    locations = list(Location.objects.all()) + [None]
+
+    author_weights = [1 / (rank + 1) for rank in range(len(users))]
+    ids = IdSequence(Post)
+    posts = [
+        mixer.blend(
+            Post,
+            id=ids.take(),
+            author=author,
+            category=rng.choice(categories),
+            location=rng.choice(locations),
+            image="",
+            is_published=rng.random() > 0.05,
+            pub_date=now - timedelta(minutes=rng.randrange(60 * 24 * 700)),
+        )
+        for author in rng.choices(
+            users, weights=author_weights, k=int(20000 * SCALE)
+        )
+    ]
+    post_weights = [1 / (rank + 1) for rank in range(len(posts))]
+    ids = IdSequence(Comment)
+    comments = [
+        mixer.blend(
+            Comment,
+            id=ids.take(),
+            post=post,
+            author=rng.choice(users),
+            created_at=now - timedelta(minutes=rng.randrange(60 * 24 * 700)),
+        )
+        for post in rng.choices(
+            posts, weights=post_weights, k=int(40000 * SCALE)
+        )
+    ]
+    with keep_auto_now(Post, Comment):
+        for post in posts:
+            post.created_at = post.pub_date
+        Post.objects.bulk_create(posts, batch_size=500)
+        Comment.objects.bulk_create(comments, batch_size=500)
+    Post.objects.recount_comments()
+    UserStats.objects.rebuild()
+
+    author = users[0]
+    author.is_staff = True
+    author.save()
+    post = Post.objects.filter(author=author, is_published=True).order_by(
+        "-comment_count"
+    ).first()
+    comment = Comment.objects.filter(post=post).first()
+    comment.author = author
+    comment.save()
+    return {
+        "author": author,
+        "post": post,
+        "comment": comment,
+        "category": post.category,
+        "search": post.title.split()[0],
+    }
+
+
+@pytest.fixture(scope="module")
+def dataset(django_db_setup, django_db_blocker):
+    from blog.models import Category, Location
+
+    with django_db_blocker.unblock():
+        data = _seed()
+        yield data
+        get_user_model().objects.all().delete()
+        Category.objects.all().delete()
+        Location.objects.all().delete()
+        cache.clear()
+    if UPDATE and results:
+        BASELINE.write_text(
+            json.dumps(results, indent=2, sort_keys=True) + "\n",
+            encoding="utf-8",
+        )
+
+
+def _request(dataset, name):
+    """URL и GET-параметры маршрута для данных из dataset."""
+    route = str(_route(name))
+    kwargs = {}
+    if "<int:post_id>" in route:
+        kwargs["post_id"] = dataset["post"].id
+    if "<int:comment_id>" in route:
+        kwargs["comment_id"] = dataset["comment"].id
+    if "<slug:category_slug>" in route:
+        kwargs["category_slug"] = dataset["category"].slug
+    if "<str:username>" in route:
+        kwargs["username"] = dataset["author"].username
+    params = {
+        "blog:search": {"q": dataset["search"]},
+        "blog:export": {"model": "post"},
+    }.get(name, {})
+    return reverse(name, kwargs=kwargs), params
+
+
+def _get(client, url, params):
+    response = client.get(url, params)
+    if response.streaming:
+        # Выгрузка формируется при чтении ответа — читаем до конца.
+        for _ in response.streaming_content:
+            pass
+    return response
+
+
+def _route(name):
+    namespace, url_name = name.split(":")
+    resolver = get_resolver().namespace_dict[namespace][1]
+    for pattern in resolver.url_patterns:
+        if pattern.name == url_name:
+            return pattern.pattern
+    raise LookupError(name)
+
+
+def _percentile(values, fraction):
+    values = sorted(values)
+    return values[min(len(values) - 1, round(fraction * (len(values) - 1)))]
+
+
+def test_every_route_is_benchmarked():
+    covered = {name for name, _ in SCENARIOS}
+    for namespace in ("blog", "pages"):
+        resolver = get_resolver().namespace_dict[namespace][1]
+        for pattern in resolver.url_patterns:
+            assert f"{namespace}:{pattern.name}" in covered, (
+                f"Добавьте маршрут {namespace}:{pattern.name} в SCENARIOS"
+                " бенчмарка."
+            )
+
+
+@pytest.mark.parametrize(
+    "name, kind", SCENARIOS, ids=[f"{n}-{k}" for n, k in SCENARIOS]
+)
+def test_route_benchmark(dataset, name, kind, capsys):
+    client = Client()
+    if kind == "author":
+        client.force_login(dataset["author"])
+    url, params = _request(dataset, name)
+
+    cache.clear()
+    response = _get(client, url, params)
+    assert response.status_code in (200, 302), (url, response.status_code)
+
+    timings = []
+    for _ in range(ROUNDS):
+        cache.clear()
+        started = time.perf_counter()
+        _get(client, url, params)
+        timings.append((time.perf_counter() - started) * 1000)
+
+    cache.clear()
+    tracemalloc.start()
+    try:
+        _get(client, url, params)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    key = f"{name}[{kind}]"
+    result = results[key] = {
+        # Счётчик blogicum.middleware.RequestMetricsMiddleware.
+        "queries": response.wsgi_request.metrics.queries,
+        "p50_ms": round(_percentile(timings, 0.5), 2),
+        "p95_ms": round(_percentile(timings, 0.95), 2),
+        "peak_kib": round(peak / 1024, 1),
+    }
+    with capsys.disabled():
+        print(f"\n{key}: {result}")
+
+    baseline = json.loads(BASELINE.read_text(encoding="utf-8")) if (
+        BASELINE.exists()
+    ) else {}
+    if UPDATE or key not in baseline:
+        return
+    base = baseline[key]
+    assert result["queries"] <= base["queries"], (
+        f"{key}: {result['queries']} SQL-запросов, в базе {base['queries']}."
+    )
+    # Сравнивается медиана: p95 из ROUNDS замеров шумит от фоновой
+    # нагрузки; запас в мс — для быстрых маршрутов.
+    assert result["p50_ms"] <= base["p50_ms"] * (1 + TOLERANCE) + 5, (
+        f"{key}: медиана {result['p50_ms']} мс, в базе {base['p50_ms']} мс."
+    )
+    assert result["peak_kib"] <= base["peak_kib"] * (1 + TOLERANCE) + 64, (
+        f"{key}: пик памяти {result['peak_kib']} КиБ,"
+        f" в базе {base['peak_kib']} КиБ."
+    )
@@ -0,0 +1,275 @@
+from datetime import timedelta
+
+import pytest
+from django.utils import timezone
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture
+def advance_time(monkeypatch):
+    """Сдвинуть timezone.now() вперёд вместо ожидания."""
+    now = timezone.now
+    offset = timedelta()
+
+    def advance(seconds):
+        nonlocal offset
+        offset += timedelta(seconds=seconds)
+        monkeypatch.setattr(timezone, "now", lambda: now() + offset)
+
+    return advance
+
+
+def test_post_card_fragment_cache(
+        mixer, user, user_client, post_with_published_location
+):
+    post = post_with_published_location
+    content = user_client.get("/").content.decode("utf-8")
+    assert post.title in content
+
+    # Обновление в обход сигналов не сбрасывает кэш: карточка из кэша.
+    type(post).objects.filter(pk=post.pk).update(title="Stale title")
+    content = user_client.get("/").content.decode("utf-8")
+    assert "Stale title" not in content, (
+        "Убедитесь, что карточка публикации берётся из кэша фрагментов."
+    )
+
+    post.refresh_from_db()
+    post.title = "Fresh title"
+    post.save()
+    assert "Fresh title" in user_client.get("/").content.decode("utf-8"), (
+        "Убедитесь, что сохранение публикации сбрасывает кэш её карточки."
+    )
+
+    post.category.title = "Renamed category"
+    post.category.save()
+    assert "Renamed category" in user_client.get("/").content.decode(
+        "utf-8"
+    ), "Убедитесь, что изменение категории сбрасывает кэш карточек."
+
+    user.username = "renamed_author"
+    user.save()
+    assert "@renamed_author" in user_client.get("/").content.decode(
+        "utf-8"
+    ), "Убедитесь, что изменение автора сбрасывает кэш карточек."
+
+    mixer.blend("blog.Comment", post=post)
+    assert "Комментарии (1)" in user_client.get("/").content.decode(
+        "utf-8"
+    ), "Убедитесь, что новый комментарий сбрасывает кэш карточки."
+
+
+def test_anonymous_page_cache(
+        django_assert_num_queries, mixer, client, user_client,
+        post_with_published_location
+):
+    post = post_with_published_location
+    urls = ("/", f"/category/{post.category.slug}/", f"/posts/{post.id}/")
+    for url in urls:
+        first = client.get(url)
+        assert first.status_code == 200
+        with django_assert_num_queries(0):
+            second = client.get(url)
+        assert second.content == first.content, (
+            f"Убедитесь, что страница `{url}` для анонимных читателей"
+            " отдаётся из кэша."
+        )
+        assert "Cookie" in second["Vary"]
+        not_modified = client.get(url, HTTP_IF_NONE_MATCH=second["ETag"])
+        assert not_modified.status_code == 304
+
+    # Авторизованные пользователи кэш не используют.
+    assert user_client.get("/").context is not None
+
+    mixer.blend("blog.Comment", post=post, text="Fresh comment")
+    for url in urls:
+        content = client.get(url).content.decode("utf-8")
+        assert "Комментарии (1)" in content or "Fresh comment" in content, (
+            f"Убедитесь, что новый комментарий сбрасывает кэш `{url}`."
+        )
+
+    post.category.is_published = False
+    post.category.save()
+    assert client.get(urls[1]).status_code == 404, (
+        "Убедитесь, что снятие категории с публикации сбрасывает кэш её"
+        " страницы."
+    )
+    assert post.title not in client.get("/").content.decode("utf-8")
+
+
+def test_anonymous_page_cache_respects_scheduled_posts(
+        mixer, client, user, published_category, advance_time
+):
+    client.get("/")
+    scheduled = mixer.blend(
+        "blog.Post",
+        author=user,
+        category=published_category,
+        is_published=True,
+        pub_date=timezone.now() + timedelta(seconds=1),
+    )
+    assert scheduled.title not in client.get("/").content.decode("utf-8")
+    advance_time(seconds=2)
+    assert scheduled.title in client.get("/").content.decode("utf-8"), (
+        "Убедитесь, что отложенная публикация появляется в кэшированной"
+        " ленте, как только наступает время её публикации."
+    )
+
+
+def test_feed_valid_until(mixer, user, published_category, advance_time):
+    from blog.cache import FEED_VERSION_KEY, get_versions
+    from blog.schedule import feed_valid_until
+
+    assert feed_valid_until() is None
+    pub_date = timezone.now() + timedelta(seconds=1)
+    mixer.blend(
+        "blog.Post", author=user, category=published_category,
+        is_published=True, pub_date=pub_date,
+    )
+    assert feed_valid_until() == pub_date, (
+        "Убедитесь, что лента считается актуальной до ближайшей отложенной"
+        " публикации."
+    )
+    generation = get_versions([FEED_VERSION_KEY])
+    assert feed_valid_until() == pub_date
+    assert get_versions([FEED_VERSION_KEY]) == generation
+
+    advance_time(seconds=2)
+    assert feed_valid_until() is None
+    assert get_versions([FEED_VERSION_KEY]) != generation, (
+        "Убедитесь, что с наступлением отложенной публикации сменяется"
+        " поколение кэша лент."
+    )
+
+
+def test_feed_count_after_scheduled_post_and_unrelated_save(
+        mixer, user, user_client, published_category, advance_time
+):
+    published_category.is_published = True
+    published_category.save()
+    posts = mixer.cycle(10).blend(
+        "blog.Post", author=user, category=published_category,
+        is_published=True, image="",
+        pub_date=timezone.now() - timedelta(days=1),
+    )
+    mixer.blend(
+        "blog.Post", author=user, category=published_category,
+        is_published=True, image="",
+        pub_date=timezone.now() + timedelta(seconds=1),
+    )
+    assert user_client.get("/").context["paginator"].count == 10
+    advance_time(seconds=2)
+    posts[0].title = "Другой заголовок"
+    posts[0].save()
+    assert user_client.get("/").context["paginator"].count == 11, (
+        "Убедитесь, что наступившая отложенная публикация учитывается в"
+        " числе публикаций ленты, даже если до следующего показа ленты"
+        " изменили другую публикацию."
+    )
+    assert user_client.get("/?page=2").status_code == 200
+
+
+def test_category_registry_invalidation(
+        user_client, post_with_published_location
+):
+    category = post_with_published_location.category
+    url = f"/category/{category.slug}/"
+    assert user_client.get(url).status_code == 200
+
+    category.title = "Переименованная категория"
+    category.save()
+    assert category.title in user_client.get(url).content.decode(), (
+        "Убедитесь, что сохранение категории обновляет реестр категорий."
+    )
+
+    category.is_published = False
+    category.save()
+    assert user_client.get(url).status_code == 404, (
+        "Убедитесь, что снятая с публикации категория пропадает из"
+        " реестра."
+    )
+
+
+def test_feed_counts_follow_changes(
+        mixer, user, user_client, published_category, another_category
+):
+    from django.db import connection
+    from django.test.utils import CaptureQueriesContext
+
+    from blog.models import Post
+
+    published_category.is_published = True
+    published_category.save()
+    another_category.is_published = True
+    another_category.save()
+    posts = mixer.cycle(14).blend(
+        "blog.Post", author=user, is_published=True, image="",
+        pub_date=timezone.now() - timedelta(days=1),
+        category=(
+            published_category if i < 11 else another_category
+            for i in range(14)
+        ),
+    )
+    urls = ("/", f"/category/{published_category.slug}/",
+            f"/profile/{user.username}/")
+
+    def visible(**filters):
+        return Post.objects.filter(
+            is_published=True, category__is_published=True,
+            pub_date__lte=timezone.now(), **filters
+        ).count()
+
+    def check():
+        expected = (visible(), visible(category=published_category),
+                    Post.objects.filter(author=user).count())
+        with CaptureQueriesContext(connection) as queries:
+            counts = tuple(
+                user_client.get(url).context["paginator"].count
+                for url in urls
+            )
+        assert counts == expected, (
+            "Убедитесь, что кэшированное число публикаций лент совпадает"
+            " с точным подсчётом."
+        )
+        return [q["sql"] for q in queries if "COUNT(" in q["sql"]]
+
+    check()
+    mixer.blend(
+        "blog.Post", author=user, is_published=True, image="",
+        category=published_category, pub_date=timezone.now(),
+    )
+    assert not check(), (
+        "Убедитесь, что число публикаций лент обновляется в кэше без"
+        " COUNT(*)."
+    )
+    posts[0].is_published = False
+    posts[0].save()
+    posts[1].delete()
+    posts[2].category = another_category
+    posts[2].save()
+    another_category.is_published = False
+    another_category.save()
+    assert not check()
+    another_category.is_published = True
+    another_category.save()
+    check()
+
+
+def test_production_cache_is_shared_between_processes(tmp_path):
+    from django.conf import settings
+    from django.core.cache import CacheHandler
+
+    def process_cache():
+        # Отдельный CacheHandler — как кэш в другом процессе.
+        return CacheHandler({
+            "default": {
+                **settings.PRODUCTION_CACHE, "LOCATION": str(tmp_path)
+            },
+        })["default"]
+
+    first, second = process_cache(), process_cache()
+    first.set("version:categories", "new", None)
+    assert second.get("version:categories") == "new", (
+        "Убедитесь, что кэш профиля production общий для процессов:"
+        " на нём держатся метки версий и реестр категорий."
+    )
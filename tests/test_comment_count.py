@@ -0,0 +1,53 @@
+import pytest
+from django.core.management import call_command
+
+pytestmark = [pytest.mark.django_db]
+
+
+def test_comment_count_is_maintained(mixer, user, post_with_published_location):
+    post = post_with_published_location
+    assert post.comment_count == 0, (
+        "Убедитесь, что у новой публикации счётчик комментариев равен нулю."
+    )
+    comments = mixer.cycle(3).blend("blog.Comment", post=post, author=user)
+    post.refresh_from_db()
+    assert post.comment_count == 3, (
+        "Убедитесь, что при добавлении комментария увеличивается"
+        " `Post.comment_count`."
+    )
+
+    comments[0].delete()
+    type(comments[0]).objects.filter(pk=comments[1].pk).delete()
+    post.refresh_from_db()
+    assert post.comment_count == 1, (
+        "Убедитесь, что при удалении комментария, в том числе через"
+        " QuerySet.delete(), уменьшается `Post.comment_count`."
+    )
+
+
+def test_recount_comments_command(mixer, user, post_with_published_location):
+    post = post_with_published_location
+    mixer.cycle(2).blend("blog.Comment", post=post, author=user)
+    type(post).objects.update(comment_count=0)
+
+    call_command("recount_comments")
+    post.refresh_from_db()
+    assert post.comment_count == 2, (
+        "Убедитесь, что команда `recount_comments` пересчитывает счётчики"
+        " комментариев."
+    )
+
+
+def test_post_save_keeps_comment_count(mixer, user,
+                                       post_with_published_location):
+    from blog.models import Post
+
+    post = Post.objects.get(pk=post_with_published_location.pk)
+    mixer.blend("blog.Comment", post=post, author=user)
+    post.title = "Новый заголовок"
+    post.save()
+    post.refresh_from_db()
+    assert (post.title, post.comment_count) == ("Новый заголовок", 1), (
+        "Убедитесь, что сохранение публикации не затирает"
+        " `Post.comment_count`, изменившийся после её загрузки."
+    )
@@ -0,0 +1,51 @@
+import pytest
+from django.test import override_settings
+
+pytestmark = [pytest.mark.django_db]
+
+
+@override_settings(DISPLAY_COMMENTS=2)
+def test_comments_load_more(mixer, user, client, post_with_published_location):
+    post = post_with_published_location
+    comments = mixer.cycle(5).blend(
+        "blog.Comment", post=post, author=user,
+        text=(f"comment-{i}-text" for i in range(5)),
+    )
+    response = client.get(f"/posts/{post.id}/")
+    page = response.context["comments"]
+    assert list(page) == comments[:2], (
+        "Убедитесь, что на странице публикации выводится первая страница"
+        " комментариев в порядке их добавления."
+    )
+    content = response.content.decode("utf-8")
+    assert "comment-2-text" not in content
+
+    shown = list(page)
+    while page.has_next():
+        response = client.get(
+            f"/posts/{post.id}/comments/", {"cursor": page.next_cursor}
+        )
+        assert response.status_code == 200
+        assert "<html" not in response.content.decode("utf-8"), (
+            "Убедитесь, что «Показать ещё» возвращает только фрагмент"
+            " со списком комментариев."
+        )
+        page = response.context["comments"]
+        shown.extend(page)
+    assert shown == comments, (
+        "Убедитесь, что постраничная загрузка выдаёт все комментарии"
+        " ровно один раз."
+    )
+
+
+def test_comments_page_hidden_for_unpublished_post(
+        another_user_client, post_with_published_location
+):
+    post = post_with_published_location
+    post.is_published = False
+    post.save()
+    response = another_user_client.get(f"/posts/{post.id}/comments/")
+    assert response.status_code == 404, (
+        "Убедитесь, что комментарии снятой с публикации записи недоступны"
+        " другим пользователям."
+    )
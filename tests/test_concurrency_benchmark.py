@@ -0,0 +1,156 @@
+"""Бенчмарк конкурентного доступа к SQLite: профиль по умолчанию и
+production (WAL, прагмы, BEGIN IMMEDIATE).
+
+    BLOGICUM_BENCHMARK=1 pytest tests/test_concurrency_benchmark.py
+
+Писатели добавляют комментарии так же, как представление: чтение
+публикации, вставка и обновление счётчика в одной транзакции.
+Читатели тем временем считают комментарии. В профиле production
+писатели не получают «database is locked», а читатели не ждут
+фиксации транзакций писателей.
+"""
+import os
+import threading
+import time
+
+import pytest
+from django.conf import settings
+from django.db.utils import ConnectionHandler, OperationalError
+
+WRITERS = 4
+READERS = 4
+WRITES = int(os.environ.get("BLOGICUM_BENCHMARK_WRITES", 100))
+# Работа представления внутри транзакции, сек.
+HOLD = 0.002
+
+pytestmark = pytest.mark.skipif(
+    not os.environ.get("BLOGICUM_BENCHMARK"),
+    reason="Бенчмарк включается переменной BLOGICUM_BENCHMARK=1.",
+)
+
+PROFILES = {
+    "default": {"ENGINE": "django.db.backends.sqlite3"},
+    "production": settings.PRODUCTION_DATABASE,
+}
+
+
+@pytest.fixture(autouse=True)
+def db_access(django_db_blocker):
+    with django_db_blocker.unblock():
+        yield
+
+
+def _percentile(values, fraction):
+    values = sorted(values)
+    return values[min(len(values) - 1, round(fraction * (len(values) - 1)))]
+
+
+def _run(handler):
+    errors = []
+    latencies = []
+    writing = threading.Event()
+    writing.set()
+
+    def writer(number):
+        connection = handler["default"]
+        try:
+            for _ in range(WRITES):
+                try:
+                    connection.set_autocommit(
+                        False,
+                        force_begin_transaction_with_broken_autocommit=True,
+                    )
+                    cursor = connection.cursor()
+                    cursor.execute("SELECT comment_count FROM post")
+                    cursor.execute(
+                        "INSERT INTO comment (post_id, text)"
+                        " VALUES (1, %s)",
+                        [f"writer {number}"],
+                    )
+                    time.sleep(HOLD)
+                    cursor.execute(
+                        "UPDATE post SET comment_count = comment_count + 1"
+                    )
+                    connection.commit()
+                except OperationalError as error:
+                    errors.append(str(error))
+                    connection.rollback()
+                finally:
+                    connection.set_autocommit(True)
+        finally:
+            connection.close()
+
+    def reader():
+        connection = handler["default"]
+        try:
+            while writing.is_set():
+                started = time.perf_counter()
+                with connection.cursor() as cursor:
+                    cursor.execute("SELECT COUNT(*) FROM comment")
+                    cursor.fetchone()
+                latencies.append((time.perf_counter() - started) * 1000)
+        finally:
+            connection.close()
+
+    writers = [
+        threading.Thread(target=writer, args=(number,))
+        for number in range(WRITERS)
+    ]
+    readers = [threading.Thread(target=reader) for _ in range(READERS)]
+    started = time.perf_counter()
+    for thread in writers + readers:
+        thread.start()
+    for thread in writers:
+        thread.join()
+    elapsed = time.perf_counter() - started
+    writing.clear()
+    for thread in readers:
+        thread.join()
+    return {
+        "errors": len(errors),
+        "writes_per_s": round((WRITERS * WRITES - len(errors)) / elapsed),
+        "reads_per_s": round(len(latencies) / elapsed),
+        "read_p50_ms": round(_percentile(latencies, 0.5), 2),
+        "read_p95_ms": round(_percentile(latencies, 0.95), 2),
+        "read_max_ms": round(max(latencies), 2),
+    }
+
+
+@pytest.fixture
+def measure(tmp_path, capsys):
+    def measure(profile):
+        handler = ConnectionHandler({
+            "default": {
+                **PROFILES[profile],
+                "NAME": str(tmp_path / f"{profile}.sqlite3"),
+            },
+        })
+        with handler["default"].cursor() as cursor:
+            cursor.execute(
+                "CREATE TABLE post (id INTEGER PRIMARY KEY,"
+                " comment_count INTEGER NOT NULL)"
+            )
+            cursor.execute(
+                "CREATE TABLE comment (id INTEGER PRIMARY KEY,"
+                " post_id INTEGER NOT NULL, text TEXT NOT NULL)"
+            )
+            cursor.execute("INSERT INTO post VALUES (1, 0)")
+        handler["default"].close()
+        result = _run(handler)
+        with capsys.disabled():
+            print(f"\nsqlite[{profile}]: {result}")
+        return result
+
+    return measure
+
+
+def test_production_profile_under_concurrency(measure):
+    default = measure("default")
+    production = measure("production")
+    assert production["errors"] == 0, (
+        "Убедитесь, что в профиле production конкурентные записи не"
+        " завершаются ошибкой «database is locked»."
+    )
+    assert production["reads_per_s"] >= default["reads_per_s"], (
+        "Убедитесь, что в профиле production чтение не ждёт писателей."
+    )
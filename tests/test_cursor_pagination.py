@@ -0,0 +1,77 @@
+from datetime import timedelta
+
+import pytest
+from django.test import override_settings
+from django.utils import timezone
+
+from conftest import N_PER_PAGE
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture
+def feed_posts(mixer, user, published_category):
+    now = timezone.now()
+    # Пары постов с одинаковой датой проверяют сортировку по (pub_date, id).
+    pub_dates = (
+        now - timedelta(hours=i // 2) for i in range(N_PER_PAGE * 2 + 5)
+    )
+    return mixer.cycle(N_PER_PAGE * 2 + 5).blend(
+        "blog.Post",
+        author=user,
+        category=published_category,
+        is_published=True,
+        pub_date=pub_dates,
+    )
+
+
+@override_settings(CURSOR_PAGINATION=True)
+@pytest.mark.parametrize("url_name", ["index", "category", "profile"])
+def test_cursor_pagination(user_client, user, published_category,
+                           feed_posts, url_name):
+    url = {
+        "index": "/",
+        "category": f"/category/{published_category.slug}/",
+        "profile": f"/profile/{user.username}/",
+    }[url_name]
+    expected = sorted(
+        feed_posts, key=lambda post: (post.pub_date, post.id), reverse=True
+    )
+
+    seen = []
+    cursors = []
+    cursor = None
+    while True:
+        response = user_client.get(url, {"cursor": cursor} if cursor else {})
+        assert response.status_code == 200
+        page = response.context["page_obj"]
+        assert len(page) <= N_PER_PAGE
+        seen.extend(page)
+        cursors.append(cursor)
+        if not page.has_next():
+            break
+        cursor = page.next_cursor
+        assert f"?cursor={cursor}" in response.content.decode("utf-8"), (
+            "Убедитесь, что в курсорном режиме пагинатор выводит ссылку на"
+            " следующую страницу."
+        )
+
+    assert [post.id for post in seen] == [post.id for post in expected], (
+        "Убедитесь, что курсорная пагинация выдаёт все публикации ровно"
+        " один раз в порядке «от новых к старым»."
+    )
+
+    response = user_client.get(url, {"cursor": cursor})
+    previous = response.context["page_obj"].previous_cursor
+    response = user_client.get(url, {"cursor": previous})
+    assert list(response.context["page_obj"]) == expected[
+        (len(cursors) - 2) * N_PER_PAGE:(len(cursors) - 1) * N_PER_PAGE
+    ], "Убедитесь, что ссылка на предыдущую страницу ведёт назад по ленте."
+
+
+@override_settings(CURSOR_PAGINATION=True)
+def test_cursor_pagination_bad_cursor(user_client):
+    response = user_client.get("/", {"cursor": "not-a-cursor"})
+    assert response.status_code == 404, (
+        "Убедитесь, что некорректный курсор приводит к ответу 404."
+    )
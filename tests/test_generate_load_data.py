@@ -0,0 +1,100 @@
+import pytest
+from django.contrib.auth import get_user_model
+from django.core.management import CommandError, call_command
+from django.db import connection
+from django.db.models import Count, F
+from django.utils import timezone
+
+pytestmark = [pytest.mark.django_db]
+
+
+def generate(*args):
+    call_command(
+        "generate_load_data", "--users", "30", "--categories", "3",
+        "--locations", "4", "--posts", "400", "--comments", "600",
+        "--future", "0.1", "--unpublished", "0.1", "--seed", "7",
+        "--chunk-size", "150", *args,
+    )
+
+
+def test_generate_load_data_counts(capsys):
+    from blog.models import Category, Comment, Location, Post
+
+    generate()
+    out, _ = capsys.readouterr()
+    assert "строк/с" in out
+    assert get_user_model().objects.count() == 30
+    assert Category.objects.count() == 3
+    assert Location.objects.count() == 4
+    assert Post.objects.count() == 400
+    assert Comment.objects.count() == 600
+
+    now = timezone.now()
+    assert Post.objects.filter(pub_date__gt=now).exists(), (
+        "Убедитесь, что generate_load_data создаёт отложенные публикации."
+    )
+    assert Post.objects.filter(is_published=False).exists(), (
+        "Убедитесь, что generate_load_data создаёт снятые с публикации"
+        " записи."
+    )
+    assert not Post.objects.filter(created_at__gt=now).exists()
+    mismatched = Post.objects.annotate(counted=Count("comments")).exclude(
+        comment_count=F("counted")
+    )
+    assert not mismatched.exists(), (
+        "Убедитесь, что после generate_load_data счётчики комментариев"
+        " публикаций пересчитаны."
+    )
+
+
+def test_generate_load_data_is_skewed():
+    from blog.models import Post
+
+    generate("--skew", "4")
+    by_author = list(
+        Post.objects.values("author").annotate(posts=Count("id"))
+        .order_by("author").values_list("posts", flat=True)
+    )
+    assert by_author[0] > by_author[-1] * 5, (
+        "Убедитесь, что первые пользователи получают заметно больше"
+        " публикаций при перекосе --skew."
+    )
+
+
+@pytest.mark.skipif(
+    connection.vendor != "sqlite", reason="Поиск FTS5 есть только в SQLite."
+)
+def test_generate_load_data_keeps_search_index():
+    from blog.models import Post
+    from blog.search import TRIGGERS, matching_post_ids
+
+    generate()
+    post = Post.objects.first()
+    word = post.title.split()[0]
+    found = Post.objects.filter(pk__in=matching_post_ids(word))
+    assert found.filter(pk=post.pk).exists(), (
+        "Убедитесь, что после generate_load_data поисковый индекс"
+        " перестроен."
+    )
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT name FROM sqlite_master WHERE type = 'trigger'"
+        )
+        triggers = {row[0] for row in cursor.fetchall()}
+    assert set(TRIGGERS) <= triggers, (
+        "Убедитесь, что generate_load_data восстанавливает триггеры"
+        " поискового индекса."
+    )
+
+
+@pytest.mark.parametrize(
+    "args",
+    [
+        ("--users", "0", "--comments", "0"),
+        ("--categories", "0", "--comments", "0"),
+        ("--posts", "0"),
+    ],
+)
+def test_generate_load_data_validates_dependencies(args):
+    with pytest.raises(CommandError):
+        call_command("generate_load_data", *args)
@@ -0,0 +1,286 @@
+from datetime import timedelta
+from io import BytesIO
+
+import pytest
+from django.core.files.base import ContentFile
+from django.core.files.images import ImageFile
+from django.core.files.storage import FileSystemStorage
+from django.core.management import call_command
+from django.test import override_settings
+from django.utils import timezone
+from PIL import Image
+
+pytestmark = [pytest.mark.django_db]
+
+
+def make_image(width, height, name="wide.jpg", color=(200, 80, 40),
+               exif=None):
+    buffer = BytesIO()
+    Image.new("RGB", (width, height), color=color).save(
+        buffer, "JPEG", exif=exif or Image.Exif()
+    )
+    return ImageFile(buffer, name=name)
+
+
+def run_jobs():
+    call_command("process_image_jobs", "--once")
+
+
+@pytest.fixture
+def wide_post(mixer, user, published_category):
+    post = mixer.blend(
+        "blog.Post",
+        author=user,
+        category=published_category,
+        is_published=True,
+        image=make_image(1000, 500),
+    )
+    run_jobs()
+    post.refresh_from_db()
+    return post
+
+
+def test_variants_built_by_worker(wide_post):
+    variants = wide_post.image_variants
+    assert variants["source"] == wide_post.image.name
+    assert [v["width"] for v in variants["variants"]] == [320, 640, 1000], (
+        "Убедитесь, что копии создаются по POST_IMAGE_WIDTHS без"
+        " увеличения сверх исходной ширины."
+    )
+    assert (variants["width"], variants["height"]) == (1000, 500)
+    storage = wide_post.image.storage
+    for variant in variants["variants"]:
+        for key, image_format in (("webp", "WEBP"), ("jpeg", "JPEG")):
+            assert variant[key].startswith("post_images/")
+            with storage.open(variant[key]) as file, Image.open(file) as img:
+                assert img.format == image_format
+                assert img.size == (variant["width"], variant["width"] // 2)
+
+
+def test_placeholder_until_processed(mixer, user, published_category, client):
+    post = mixer.blend(
+        "blog.Post",
+        author=user,
+        category=published_category,
+        is_published=True,
+        image=make_image(800, 600),
+    )
+    assert post.image_jobs.get().status == "pending"
+    content = client.get("/").content.decode("utf-8")
+    assert "image-pending.svg" in content, (
+        "Убедитесь, что до обработки фото в карточке выводится заглушка."
+    )
+    run_jobs()
+    assert post.image_jobs.get().status == "done"
+    content = client.get("/").content.decode("utf-8")
+    assert "image-pending.svg" not in content, (
+        "Убедитесь, что после обработки фото сбрасывается кэш карточки."
+    )
+    assert "srcset=" in content
+
+
+def test_exif_stripped(mixer, user, published_category):
+    exif = Image.Exif()
+    exif[0x0110] = "Secret camera"  # Model
+    exif[0x0112] = 6  # Orientation: повернуть на 90°
+    post = mixer.blend(
+        "blog.Post",
+        author=user,
+        category=published_category,
+        image=make_image(400, 200, exif=exif),
+    )
+    run_jobs()
+    post.refresh_from_db()
+    with post.image.open("rb"), Image.open(post.image) as img:
+        assert not img.getexif(), "Убедитесь, что EXIF удаляется из фото."
+        assert img.size == (200, 400)
+    assert post.image_variants["width"] == 200
+    assert post.image_variants["height"] == 400
+
+
+def test_original_kept_until_stripped_copy_is_saved(
+        monkeypatch, mixer, user, published_category
+):
+    import blog.images
+
+    exif = Image.Exif()
+    exif[0x0110] = "Secret camera"  # Model
+    post = mixer.blend(
+        "blog.Post",
+        author=user,
+        category=published_category,
+        image=make_image(400, 200, exif=exif),
+    )
+    original = post.image.name
+    storage = post.image.storage
+    build = blog.images.build_image_variants
+
+    def broken(*args, **kwargs):
+        raise OSError("disk full")
+
+    with monkeypatch.context() as patch:
+        patch.setattr(FileSystemStorage, "_save", broken)
+        run_jobs()
+    post.refresh_from_db()
+    assert post.image.name == original and storage.exists(original), (
+        "Убедитесь, что оригинал фото не удаляется, пока не сохранена"
+        " очищенная копия."
+    )
+
+    monkeypatch.setattr(blog.images, "build_image_variants", broken)
+    post.image_jobs.update(run_after=timezone.now())
+    listed = set(storage.listdir("post_images")[1])
+    run_jobs()
+    post.refresh_from_db()
+    assert post.image.name == original and storage.exists(original), (
+        "Убедитесь, что при сбое обработки оригинал фото не теряется."
+    )
+    assert set(storage.listdir("post_images")[1]) == listed, (
+        "Убедитесь, что при сбое очищенная копия фото удаляется."
+    )
+
+    monkeypatch.setattr(blog.images, "build_image_variants", build)
+    post.image_jobs.update(run_after=timezone.now())
+    run_jobs()
+    post.refresh_from_db()
+    assert post.image.name != original and not storage.exists(original), (
+        "Убедитесь, что оригинал с EXIF удаляется после переключения"
+        " публикации на очищенную копию."
+    )
+    with post.image.open("rb"), Image.open(post.image) as img:
+        assert not img.getexif()
+
+
+def test_variants_reused_for_same_content(mixer, user, published_category,
+                                          wide_post):
+    twin = mixer.blend(
+        "blog.Post",
+        author=user,
+        category=published_category,
+        image=make_image(1000, 500, name="copy.jpg"),
+    )
+    run_jobs()
+    twin.refresh_from_db()
+    assert twin.image.name != wide_post.image.name
+    assert (
+        twin.image_variants["variants"]
+        == wide_post.image_variants["variants"]
+    ), "Убедитесь, что имена копий зависят от содержимого файла."
+
+
+def test_variants_follow_image_changes(wide_post):
+    old = wide_post.image_variants["variants"]
+    wide_post.image = make_image(800, 800, color=(0, 0, 255))
+    wide_post.save()
+    assert wide_post.image_pending
+    run_jobs()
+    wide_post.refresh_from_db()
+    assert wide_post.image_variants["source"] == wide_post.image.name
+    assert wide_post.image_variants["variants"] != old
+
+    wide_post.image = None
+    wide_post.save()
+    wide_post.refresh_from_db()
+    assert wide_post.image_variants == {}
+
+
+def test_superseded_job_skipped(wide_post):
+    wide_post.image = make_image(300, 300, name="first.jpg")
+    wide_post.save()
+    wide_post.image = make_image(200, 200, name="second.jpg")
+    wide_post.save()
+    run_jobs()
+    wide_post.refresh_from_db()
+    assert wide_post.image_variants["source"] == wide_post.image.name
+    assert wide_post.image_variants["width"] == 200
+
+
+@override_settings(IMAGE_JOB_MAX_ATTEMPTS=2)
+def test_retry_then_dead_letter(monkeypatch, mixer, user, published_category,
+                                client):
+    def broken_storage(*args, **kwargs):
+        raise OSError("storage is down")
+
+    monkeypatch.setattr("blog.images.build_image_variants", broken_storage)
+    post = mixer.blend(
+        "blog.Post",
+        author=user,
+        category=published_category,
+        is_published=True,
+        image=make_image(400, 300),
+    )
+    run_jobs()
+    job = post.image_jobs.get()
+    assert (job.status, job.attempts) == ("pending", 1), (
+        "Убедитесь, что после сбоя задача возвращается в очередь."
+    )
+    assert job.run_after > timezone.now()
+    assert "storage is down" in job.last_error
+
+    run_jobs()
+    assert post.image_jobs.get().attempts == 1, (
+        "Убедитесь, что повтор откладывается до run_after."
+    )
+    type(job).objects.update(run_after=timezone.now() - timedelta(seconds=1))
+    run_jobs()
+    assert post.image_jobs.get().status == "dead", (
+        "Убедитесь, что после IMAGE_JOB_MAX_ATTEMPTS задача помечается"
+        " как dead."
+    )
+    content = client.get("/").content.decode("utf-8")
+    assert f'src="{post.image.url}"' in content
+
+
+def test_broken_image_is_dead_at_once(mixer, user, published_category,
+                                      client):
+    post = mixer.blend(
+        "blog.Post",
+        author=user,
+        category=published_category,
+        is_published=True,
+        image=ContentFile(b"not an image", name="broken.jpg"),
+    )
+    run_jobs()
+    job = post.image_jobs.get()
+    assert (job.status, job.attempts) == ("dead", 1)
+    content = client.get("/").content.decode("utf-8")
+    assert f'src="{post.image.url}"' in content
+
+
+def test_stale_running_job_requeued(mixer, user, published_category):
+    post = mixer.blend(
+        "blog.Post",
+        author=user,
+        category=published_category,
+        image=make_image(400, 300),
+    )
+    job = post.image_jobs.get()
+    type(job).objects.update(
+        status="running", locked_at=timezone.now() - timedelta(days=1)
+    )
+    run_jobs()
+    assert post.image_jobs.get().status == "done"
+
+
+def test_card_uses_srcset_and_detail_links_original(client, wide_post):
+    variants = wide_post.image_variants["variants"]
+    content = client.get("/").content.decode("utf-8")
+    assert 'type="image/webp"' in content
+    assert f"{variants[0]['webp']} 320w" in content
+    assert f'src="{wide_post.image.url}"' not in content, (
+        "Убедитесь, что карточки в ленте не загружают оригинал изображения."
+    )
+    storage = wide_post.image.storage
+    assert f'src="{storage.url(variants[1]["jpeg"])}"' in content
+
+    content = client.get(f"/posts/{wide_post.id}/").content.decode("utf-8")
+    assert f'href="{wide_post.image.url}"' in content, (
+        "Убедитесь, что страница публикации ссылается на оригинал."
+    )
+
+
+def test_build_image_variants_command(wide_post):
+    type(wide_post).objects.filter(pk=wide_post.pk).update(image_variants={})
+    call_command("build_image_variants")
+    wide_post.refresh_from_db()
+    assert len(wide_post.image_variants["variants"]) == 3
@@ -0,0 +1,169 @@
+import json
+from datetime import datetime, timedelta
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.core.management import CommandError, call_command
+from django.utils import timezone
+
+pytestmark = [pytest.mark.django_db]
+
+
+def write_jsonl(path, records):
+    path.write_text(
+        "\n".join(json.dumps(record, ensure_ascii=False)
+                  for record in records),
+        encoding="utf-8",
+    )
+    return str(path)
+
+
+@pytest.fixture
+def archive(tmp_path, published_category):
+    created = "2020-05-01T10:00:00+00:00"
+    records = [
+        {"model": "user", "username": "archivist", "email": "a@example.com"},
+        {"model": "user", "username": "reader"},
+    ]
+    for pk in range(1000, 1012):
+        records.append({
+            "model": "post", "id": pk, "title": f"Архив {pk}",
+            "text": "Текст", "author": "archivist",
+            "category": published_category.slug, "location": "Москва",
+            "pub_date": "2020-05-01T12:00:00", "created_at": created,
+        })
+        records.append({
+            "model": "comment", "id": pk, "post": pk, "author": "reader",
+            "text": "Комментарий", "created_at": created,
+        })
+    records += [
+        {"model": "post", "title": "Нет категории", "text": "т",
+         "author": "archivist", "category": "missing",
+         "pub_date": "2020-05-01T12:00:00"},
+        {"model": "comment", "post": 999999, "author": "reader",
+         "text": "Сирота"},
+    ]
+    return write_jsonl(tmp_path / "archive.jsonl", records)
+
+
+def test_import_jsonl(archive, capsys):
+    from blog.models import Comment, Location, Post
+
+    call_command("import_blog", archive, "--chunk-size", "5")
+    out, err = capsys.readouterr()
+    assert "user: 2, post: 12, comment: 12; пропущено: 2" in out
+    assert "строк/с" in out
+    assert "missing" in err
+
+    posts = Post.objects.filter(pk__range=(1000, 1011))
+    assert posts.count() == 12, (
+        "Убедитесь, что import_blog сохраняет id публикаций из источника."
+    )
+    post = posts.get(pk=1000)
+    assert post.author.username == "archivist"
+    assert post.location == Location.objects.get(name="Москва")
+    assert timezone.is_aware(post.pub_date)
+    assert post.created_at == datetime(
+        2020, 5, 1, 10, tzinfo=timezone.utc
+    ), "Убедитесь, что даты создания из источника не заменяются текущими."
+    assert set(posts.values_list("comment_count", flat=True)) == {1}, (
+        "Убедитесь, что после загрузки пересчитывается comment_count."
+    )
+    assert Comment.objects.filter(post__in=posts).count() == 12
+    assert not get_user_model().objects.get(
+        username="archivist"
+    ).has_usable_password()
+
+    call_command("import_blog", archive)
+    out, err = capsys.readouterr()
+    assert "пропущено: 26" in out, (
+        "Убедитесь, что записи с уже занятым id учитываются как"
+        " пропущенные."
+    )
+    assert "post 1000: id уже занят" in err
+    assert Post.objects.count() == 12 and Comment.objects.count() == 12, (
+        "Убедитесь, что повторная загрузка не дублирует записи."
+    )
+
+
+def test_import_csv(tmp_path, user, published_category):
+    from blog.models import Post
+
+    path = tmp_path / "posts.csv"
+    path.write_text(
+        "title,text,author,category,pub_date,is_published\n"
+        f"Первый,Текст,{user.username},{published_category.slug},"
+        "2021-01-01 10:00:00,True\n"
+        f"Второй,Текст,{user.username},,2021-01-02 10:00:00,False\n",
+        encoding="utf-8",
+    )
+    call_command("import_blog", str(path), "--model", "post")
+    posts = Post.objects.order_by("pub_date")
+    assert [post.title for post in posts] == ["Первый", "Второй"]
+    assert [post.is_published for post in posts] == [True, False]
+    assert posts[1].category is None
+
+
+def test_import_skips_blank_and_repeated_rows(tmp_path, user, capsys):
+    from blog.models import Post
+
+    path = tmp_path / "posts.csv"
+    path.write_text(
+        "id,title,text,author,pub_date\n"
+        f"5000,Первый,Текст,{user.username},2021-01-01 10:00:00\n"
+        f"5001,Без даты,Текст,{user.username},\n"
+        f"5002,,Текст,{user.username},2021-01-01 10:00:00\n"
+        f"5000,Повтор,Текст,{user.username},2021-01-01 10:00:00\n"
+        f"5003,Второй,Текст,{user.username},2021-01-01 10:00:00\n"
+        f"5000,Повтор после записи,Текст,{user.username},"
+        "2021-01-01 10:00:00\n",
+        encoding="utf-8",
+    )
+    call_command(
+        "import_blog", str(path), "--model", "post", "--chunk-size", "2"
+    )
+    out, err = capsys.readouterr()
+    assert "post: 2, comment: 0; пропущено: 4" in out, (
+        "Убедитесь, что записи без обязательных полей и с повторным id"
+        " пропускаются, а не прерывают загрузку."
+    )
+    assert "пустое поле pub_date" in err
+    assert "повторный id 5000" in err
+    assert "post 5000: id уже занят" in err
+    assert sorted(Post.objects.values_list("title", flat=True)) == [
+        "Второй", "Первый"
+    ]
+
+
+def test_import_csv_requires_model(tmp_path):
+    path = tmp_path / "posts.csv"
+    path.write_text("title\n", encoding="utf-8")
+    with pytest.raises(CommandError):
+        call_command("import_blog", str(path))
+
+
+def test_import_invalidates_feed(tmp_path, client, user, published_category):
+    client.get("/")
+    path = write_jsonl(tmp_path / "one.jsonl", [{
+        "model": "post", "title": "Свежая из архива", "text": "т",
+        "author": user.username, "category": published_category.slug,
+        "pub_date": (timezone.now() - timedelta(hours=1)).isoformat(),
+    }])
+    call_command("import_blog", path)
+    assert "Свежая из архива" in client.get("/").content.decode("utf-8"), (
+        "Убедитесь, что после загрузки сбрасывается кэш лент."
+    )
+
+
+def test_import_queries_do_not_grow_per_row(
+        tmp_path, user, published_category, django_assert_max_num_queries
+):
+    records = [
+        {"model": "post", "title": f"Пост {i}", "text": "т",
+         "author": user.username, "category": published_category.slug,
+         "pub_date": "2021-01-01T10:00:00"}
+        for i in range(200)
+    ]
+    path = write_jsonl(tmp_path / "many.jsonl", records)
+    with django_assert_max_num_queries(20):
+        call_command("import_blog", path, "--batch-size", "100")
@@ -0,0 +1,55 @@
+import pytest
+from django.conf import settings
+from django.db import connection
+from django.test import RequestFactory
+
+from blog.views import PostCategoryView, PostListView, ProfileListView
+
+pytestmark = [
+    pytest.mark.django_db,
+    pytest.mark.skipif(
+        connection.vendor != "sqlite", reason="EXPLAIN QUERY PLAN — SQLite"
+    ),
+]
+
+
+def get_feed_plan(view_class, user, **kwargs):
+    request = RequestFactory().get("/")
+    request.user = user
+    view = view_class()
+    view.setup(request, **kwargs)
+    queryset = view.get_queryset()[:settings.DISPLAY_POSTS]
+    return queryset.explain()
+
+
+@pytest.mark.parametrize(
+    "view_class, index_name",
+    [
+        (PostListView, "post_feed_idx"),
+        (PostCategoryView, "post_category_feed_idx"),
+        (ProfileListView, "post_author_feed_idx"),
+    ],
+    ids=["index", "category", "profile"],
+)
+def test_feed_queries_use_indexes(
+        many_posts_with_published_locations, published_category, user,
+        view_class, index_name
+):
+    plan = get_feed_plan(
+        view_class,
+        user,
+        category_slug=published_category.slug,
+        username=user.username,
+    )
+    assert f"USING INDEX {index_name}" in plan, (
+        f"Убедитесь, что запрос ленты `{view_class.__name__}` использует"
+        f" индекс `{index_name}`:\n{plan}"
+    )
+    assert "TEMP B-TREE" not in plan, (
+        f"Убедитесь, что лента `{view_class.__name__}` сортируется по"
+        f" индексу, а не во временном B-tree:\n{plan}"
+    )
+    assert "SCAN blog_post" not in plan, (
+        f"Убедитесь, что лента `{view_class.__name__}` не читает таблицу"
+        f" публикаций целиком:\n{plan}"
+    )
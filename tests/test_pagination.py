@@ -0,0 +1,23 @@
+from datetime import timedelta
+
+import pytest
+from django.utils import timezone
+
+pytestmark = [pytest.mark.django_db]
+
+
+def test_page_range_is_windowed(client, mixer, user, published_category):
+    mixer.cycle(120).blend(
+        "blog.Post", author=user, category=published_category,
+        is_published=True, image="",
+        pub_date=timezone.now() - timedelta(days=1),
+    )
+    response = client.get("/", {"page": 6})
+    page_range = response.context["page_range"]
+    assert page_range == [1, "…", 4, 5, 6, 7, 8, "…", 12], (
+        "Убедитесь, что пагинатор показывает окно страниц вокруг текущей"
+        " с многоточиями, а не все номера."
+    )
+    content = response.content.decode()
+    assert 'href="?page=12"' in content
+    assert 'href="?page=10"' not in content
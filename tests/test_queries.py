@@ -0,0 +1,81 @@
+import pytest
+
+pytestmark = [pytest.mark.django_db]
+
+
+def test_post_detail_queries(
+        django_assert_num_queries, mixer, user_client, client,
+        post_with_published_location
+):
+    mixer.cycle(5).blend("blog.Comment", post=post_with_published_location)
+    url = f"/posts/{post_with_published_location.id}/"
+    # Публикация со связанными объектами и комментарии с авторами.
+    with django_assert_num_queries(2):
+        client.get(url)
+    # Плюс сессия и пользователь.
+    with django_assert_num_queries(4):
+        user_client.get(url)
+
+
+def test_post_edit_queries(
+        django_assert_num_queries, user_client, post_with_published_location
+):
+    post_id = post_with_published_location.id
+    # Сессия, пользователь, публикация и варианты выбора категории/места.
+    with django_assert_num_queries(5):
+        user_client.get(f"/posts/{post_id}/edit/")
+    with django_assert_num_queries(3):
+        user_client.get(f"/posts/{post_id}/delete/")
+
+
+@pytest.mark.parametrize("n_comments", [1, 5])
+def test_post_comments_page_queries(
+        django_assert_num_queries, mixer, client,
+        post_with_published_location, n_comments
+):
+    mixer.cycle(n_comments).blend(
+        "blog.Comment", post=post_with_published_location
+    )
+    with django_assert_num_queries(2):
+        client.get(f"/posts/{post_with_published_location.id}/comments/")
+
+
+def test_category_page_queries(
+        django_assert_num_queries, user_client, post_with_published_location
+):
+    url = f"/category/{post_with_published_location.category.slug}/"
+    user_client.get(url)
+    # Сессия, пользователь и страница; категория — из реестра в кэше,
+    # число публикаций — из кэша счётчиков лент.
+    with django_assert_num_queries(3):
+        user_client.get(url)
+
+
+def test_profile_queries(
+        django_assert_num_queries, mixer, client, user_client,
+        another_user_client, user, another_user,
+        post_with_published_location
+):
+    mixer.cycle(3).blend(
+        "blog.Post", author=another_user,
+        category=post_with_published_location.category,
+        is_published=True,
+    )
+    url = f"/profile/{user.username}/"
+    # Второй запрос автора находит число публикаций в кэше и запоминает
+    # момент следующей отложенной публикации.
+    user_client.get(url)
+    user_client.get(url)
+    # Профиль со статистикой, число публикаций и страница.
+    with django_assert_num_queries(3):
+        response = client.get(url)
+    posts = list(response.context["page_obj"])
+    assert posts and all(post.author_id == user.id for post in posts), (
+        "Убедитесь, что в профиле показаны только публикации автора."
+    )
+    # Плюс сессия и пользователь; число публикаций автора и гостя уже
+    # в кэше счётчиков.
+    with django_assert_num_queries(4):
+        user_client.get(url)
+    with django_assert_num_queries(4):
+        another_user_client.get(url)
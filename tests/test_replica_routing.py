@@ -0,0 +1,115 @@
+import pytest
+from django.core.cache import cache
+from django.test import override_settings
+from django.urls import reverse
+
+from blogicum import routers
+from blogicum.middleware import ReplicaRoutingMiddleware
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture
+def replica_reads(monkeypatch):
+    """Реплика — та же тестовая база; записываются чтения с реплики."""
+    reads = []
+
+    def choice(replicas):
+        reads.append(replicas)
+        return "default"
+
+    monkeypatch.setattr(routers.random, "choice", choice)
+    with override_settings(DATABASE_REPLICAS=["default"]):
+        yield reads
+
+
+def test_router_reads_replica_only_when_allowed():
+    from blog.models import Post
+
+    router = routers.ReplicaRouter()
+    with override_settings(DATABASE_REPLICAS=["replica1"]):
+        assert router.db_for_read(Post) is None
+        with routers.read_from_replica():
+            assert router.db_for_read(Post) == "replica1"
+            assert router.db_for_write(Post) == "default"
+        assert router.db_for_read(Post) is None
+    with routers.read_from_replica():
+        assert router.db_for_read(Post) is None, (
+            "Убедитесь, что без настроенных реплик чтение идёт с default."
+        )
+
+
+def test_read_only_views_use_replica(client, replica_reads,
+                                     post_with_published_location):
+    response = client.get(reverse("blog:index"))
+    assert response.status_code == 200
+    assert replica_reads, (
+        "Убедитесь, что лента публикаций читает с реплики."
+    )
+    assert routers.replica_reads.get() is False, (
+        "Убедитесь, что разрешение читать с реплики сбрасывается после"
+        " запроса."
+    )
+    replica_reads.clear()
+    client.get(reverse("blog:search"), {"q": "текст"})
+    assert not replica_reads
+
+
+def test_write_pins_reader_to_primary(user_client, replica_reads,
+                                      post_with_published_location):
+    post = post_with_published_location
+    response = user_client.post(
+        reverse("blog:add_comment", args=[post.id]), {"text": "Новый"}
+    )
+    assert response.status_code == 302
+    assert ReplicaRoutingMiddleware.PIN_COOKIE in response.cookies, (
+        "Убедитесь, что после записи ставится cookie, закрепляющая чтение"
+        " за основной базой."
+    )
+    replica_reads.clear()
+    response = user_client.get(reverse("blog:post_detail", args=[post.id]))
+    assert "Новый" in response.content.decode()
+    assert not replica_reads, (
+        "Убедитесь, что сразу после записи автор читает с основной базы."
+    )
+
+
+@pytest.fixture
+def lagging_replica(monkeypatch, replica_reads):
+    """Реплика отдаёт публикации со старым заголовком."""
+    from blog.models import Post
+
+    from_db = Post.from_db.__func__
+    lag = {"active": True}
+
+    def lagging_from_db(cls, db, field_names, values):
+        instance = from_db(cls, db, field_names, values)
+        if lag["active"] and routers.replica_reads.get():
+            instance.title = "Старый заголовок"
+        return instance
+
+    monkeypatch.setattr(Post, "from_db", classmethod(lagging_from_db))
+    return lag
+
+
+def test_lagging_replica_does_not_fill_caches(client, lagging_replica,
+                                              post_with_published_location):
+    post = post_with_published_location
+    post.title = "Новый заголовок"
+    post.save()
+    index = reverse("blog:index")
+    profile = reverse("blog:profile", args=[post.author.username])
+
+    client.get(index)
+    assert "Новый заголовок" in client.get(index).content.decode(), (
+        "Убедитесь, что страница для кэша рисуется с основной базы, а не"
+        " с отстающей реплики."
+    )
+
+    cache.clear()
+    client.get(profile)
+    lagging_replica["active"] = False
+    assert "Новый заголовок" in client.get(profile).content.decode(), (
+        "Убедитесь, что карточки, нарисованные по данным реплики, не"
+        " сохраняются в кэше."
+    )
@@ -0,0 +1,46 @@
+import json
+import logging
+
+import pytest
+from django.test import override_settings
+
+from blogicum.middleware import QueryBudgetExceeded
+
+pytestmark = [pytest.mark.django_db]
+
+
+def test_server_timing_header(user_client, post_with_published_location):
+    response = user_client.get("/")
+    timing = response["Server-Timing"]
+    for metric in ("db;dur=", "tpl;dur=", "view;dur=", "total;dur="):
+        assert metric in timing, (
+            "Убедитесь, что заголовок Server-Timing содержит время БД,"
+            " шаблона и представления."
+        )
+    assert 'queries"' in timing
+
+
+def test_structured_log_line(user_client, post_with_published_location,
+                             caplog):
+    with caplog.at_level(logging.INFO, logger="blogicum.requests"):
+        user_client.get(f"/posts/{post_with_published_location.id}/")
+    record = json.loads(caplog.records[-1].getMessage())
+    assert record["view"] == "blog:post_detail"
+    assert record["status"] == 200
+    assert 0 < record["queries"] <= 4
+    assert record["total_ms"] >= record["template_ms"] >= 0
+
+
+@override_settings(QUERY_BUDGETS={"blog:index": 1})
+def test_query_budget_strict(user_client, post_with_published_location):
+    with pytest.raises(QueryBudgetExceeded):
+        user_client.get("/")
+
+
+@override_settings(QUERY_BUDGETS={"blog:index": 1}, QUERY_BUDGET_STRICT=False)
+def test_query_budget_warning(user_client, post_with_published_location,
+                              caplog):
+    with caplog.at_level(logging.WARNING, logger="blogicum.requests"):
+        response = user_client.get("/")
+    assert response.status_code == 200
+    assert "blog:index" in caplog.records[-1].getMessage()
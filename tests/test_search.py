@@ -0,0 +1,85 @@
+from datetime import timedelta
+
+import pytest
+from django.test import override_settings
+from django.utils import timezone
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture
+def searchable_posts(mixer, user, published_category):
+    def blend(**kwargs):
+        params = dict(
+            author=user, category=published_category, is_published=True,
+            pub_date=timezone.now() - timedelta(days=1),
+        )
+        params.update(kwargs)
+        return mixer.blend("blog.Post", **params)
+
+    return {
+        "title": blend(title="Квантовые котики", text="обычный текст"),
+        "text": blend(title="Заметка", text="про квантовые вычисления"),
+        "other": blend(title="Погода", text="дождь"),
+        "unpublished": blend(title="Квантовый черновик", is_published=False),
+        "future": blend(
+            title="Квантовое будущее",
+            pub_date=timezone.now() + timedelta(days=1),
+        ),
+        "hidden_category": blend(
+            title="Квантовая тайна",
+            category=mixer.blend("blog.Category", is_published=False),
+        ),
+    }
+
+
+def search(client, query, **params):
+    response = client.get("/search/", {"q": query, **params})
+    assert response.status_code == 200
+    return response.context["page_obj"]
+
+
+def test_search_ranking_and_visibility(client, searchable_posts):
+    found = list(search(client, "квантов"))
+    assert found == [searchable_posts["title"], searchable_posts["text"]], (
+        "Убедитесь, что поиск находит только видимые в ленте публикации"
+        " и совпадения в заголовке ранжируются выше совпадений в тексте."
+    )
+    assert list(search(client, "")) == []
+    assert list(search(client, 'AND OR "* NEAR(')) == [], (
+        "Убедитесь, что операторы FTS5 в запросе не вызывают ошибок."
+    )
+
+
+def test_search_index_follows_changes(client, searchable_posts):
+    post = searchable_posts["other"]
+    post.title = "Солнечная погода"
+    post.save()
+    assert list(search(client, "солнечная")) == [post]
+    assert list(search(client, "дождь")) == [post]
+    post.delete()
+    assert list(search(client, "солнечная")) == [], (
+        "Убедитесь, что поисковый индекс обновляется при изменении и"
+        " удалении публикаций."
+    )
+
+
+@override_settings(DISPLAY_POSTS=2)
+def test_search_keyset_pagination(mixer, client, user, published_category):
+    posts = mixer.cycle(5).blend(
+        "blog.Post", author=user, category=published_category,
+        is_published=True, pub_date=timezone.now() - timedelta(days=1),
+        title="Одинаковый заголовок",
+    )
+    seen = []
+    page = search(client, "одинаковый")
+    seen.extend(page)
+    while page.has_next():
+        page = search(client, "одинаковый", cursor=page.next_cursor)
+        seen.extend(page)
+    assert sorted(post.id for post in seen) == sorted(
+        post.id for post in posts
+    ) and len(seen) == len(posts), (
+        "Убедитесь, что постраничный вывод результатов поиска выдаёт каждую"
+        " публикацию ровно один раз."
+    )
@@ -0,0 +1,69 @@
+import pytest
+from django.conf import settings
+from django.db.utils import ConnectionHandler, OperationalError
+
+
+@pytest.fixture(autouse=True)
+def db_access(django_db_blocker):
+    with django_db_blocker.unblock():
+        yield
+
+
+def production_connection(path, **pragmas):
+    """Соединение с настройками профиля production к файлу path."""
+    options = settings.PRODUCTION_DATABASE["OPTIONS"]
+    handler = ConnectionHandler({
+        "default": {
+            **settings.PRODUCTION_DATABASE,
+            "NAME": str(path),
+            "OPTIONS": {
+                **options,
+                "pragmas": {**options["pragmas"], **pragmas},
+            },
+        },
+    })
+    return handler["default"]
+
+
+def begin(connection):
+    # Так транзакцию открывает atomic() на SQLite.
+    connection.set_autocommit(
+        False, force_begin_transaction_with_broken_autocommit=True
+    )
+
+
+def pragma(connection, name):
+    with connection.cursor() as cursor:
+        cursor.execute(f"PRAGMA {name}")
+        return cursor.fetchone()[0]
+
+
+def test_production_backend_applies_pragmas(tmp_path):
+    connection = production_connection(tmp_path / "db.sqlite3")
+    try:
+        assert pragma(connection, "journal_mode") == "wal", (
+            "Убедитесь, что профиль production включает журнал WAL."
+        )
+        assert pragma(connection, "synchronous") == 1
+        assert pragma(connection, "busy_timeout") == 5000
+        assert pragma(connection, "cache_size") == -20000
+        assert pragma(connection, "foreign_keys") == 1
+    finally:
+        connection.close()
+
+
+def test_production_backend_begins_immediate(tmp_path):
+    path = tmp_path / "db.sqlite3"
+    writer = production_connection(path)
+    other = production_connection(path, busy_timeout=0)
+    try:
+        with writer.cursor() as cursor:
+            cursor.execute("CREATE TABLE note (id INTEGER PRIMARY KEY)")
+        begin(writer)
+        writer.cursor().execute("SELECT COUNT(*) FROM note")
+        with pytest.raises(OperationalError, match="locked"):
+            # Блокировка записи взята при BEGIN, до первой записи.
+            begin(other)
+    finally:
+        writer.close()
+        other.close()
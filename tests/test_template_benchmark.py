@@ -0,0 +1,89 @@
+"""Бенчмарк отрисовки шаблонов: загрузчик без кэша и кэширующий.
+
+    BLOGICUM_BENCHMARK=1 pytest tests/test_template_benchmark.py
+
+Сравнивается медиана полного времени запроса: карточки публикаций
+отрисовываются ещё в представлении (blog.cache.get_post_cards).
+Отдельно выводится время отрисовки ответа из метрик
+blogicum.middleware. Кэш страниц и карточек очищается перед каждым
+запросом, так что все шаблоны отрисовываются каждый раз.
+"""
+import os
+import statistics
+import time
+from copy import deepcopy
+
+import pytest
+from django.conf import settings
+from django.core.cache import cache
+from django.test import override_settings
+
+from blogicum.warmup import warm_templates
+
+ROUNDS = int(os.environ.get("BLOGICUM_BENCHMARK_ROUNDS", 15))
+
+pytestmark = [
+    pytest.mark.skipif(
+        not os.environ.get("BLOGICUM_BENCHMARK"),
+        reason="Бенчмарк включается переменной BLOGICUM_BENCHMARK=1.",
+    ),
+    pytest.mark.django_db,
+]
+
+FILE_LOADERS = [
+    "django.template.loaders.filesystem.Loader",
+    "django.template.loaders.app_directories.Loader",
+]
+
+PROFILES = {
+    "disk": FILE_LOADERS,
+    "cached": [("django.template.loaders.cached.Loader", FILE_LOADERS)],
+}
+
+
+def templates(loaders):
+    result = deepcopy(settings.TEMPLATES)
+    result[0]["APP_DIRS"] = False
+    result[0]["OPTIONS"]["loaders"] = loaders
+    return result
+
+
+@pytest.fixture
+def pages(mixer, user, published_category, published_location):
+    posts = mixer.cycle(10).blend(
+        "blog.Post", author=user, category=published_category,
+        location=published_location, is_published=True, image="",
+    )
+    mixer.cycle(10).blend("blog.Comment", post=posts[0], author=user)
+    return {"index": "/", "detail": f"/posts/{posts[0].id}/"}
+
+
+def _measure(client, url):
+    totals, renders = [], []
+    for _ in range(ROUNDS):
+        cache.clear()
+        started = time.perf_counter()
+        response = client.get(url)
+        totals.append((time.perf_counter() - started) * 1000)
+        assert response.status_code == 200
+        renders.append(response.wsgi_request.metrics.template_time * 1000)
+    return {
+        "total_ms": round(statistics.median(totals), 2),
+        "tpl_ms": round(statistics.median(renders), 2),
+    }
+
+
+@pytest.mark.parametrize("page", ["index", "detail"])
+def test_cached_loader_render_cost(client, pages, page, capsys):
+    results = {}
+    for profile, loaders in PROFILES.items():
+        with override_settings(TEMPLATES=templates(loaders)):
+            if profile == "cached":
+                warm_templates()
+            results[profile] = _measure(client, pages[page])
+    with capsys.disabled():
+        print(f"\ntemplates[{page}]: {results}")
+    assert results["cached"]["total_ms"] < results["disk"]["total_ms"], (
+        "Убедитесь, что с кэширующим загрузчиком шаблон отрисовывается"
+        " быстрее, чем с чтением с диска."
+    )
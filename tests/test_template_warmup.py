@@ -0,0 +1,41 @@
+from copy import deepcopy
+
+from django.conf import settings
+from django.core.management import call_command
+from django.template import engines
+from django.test import override_settings
+
+from blogicum.warmup import warm_templates
+
+CACHED_LOADERS = [
+    ("django.template.loaders.cached.Loader", [
+        "django.template.loaders.filesystem.Loader",
+        "django.template.loaders.app_directories.Loader",
+    ]),
+]
+
+
+def cached_templates():
+    templates = deepcopy(settings.TEMPLATES)
+    templates[0]["APP_DIRS"] = False
+    templates[0]["OPTIONS"]["loaders"] = CACHED_LOADERS
+    return templates
+
+
+def test_warm_templates_fills_cached_loader():
+    with override_settings(TEMPLATES=cached_templates()):
+        count, _ = warm_templates()
+        loader = engines["django"].engine.template_loaders[0]
+        cached = set(loader.get_template_cache)
+    names = {"base.html", "blog/index.html", "includes/post_card.html",
+             "includes/category_link.html"}
+    assert names <= cached, (
+        "Убедитесь, что warm_templates загружает шаблоны проекта в кэш"
+        " загрузчика."
+    )
+    assert count == len(cached)
+
+
+def test_warm_templates_command(capsys):
+    call_command("warm_templates")
+    assert "Загружено шаблонов:" in capsys.readouterr().out
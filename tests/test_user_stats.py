@@ -0,0 +1,147 @@
+import pytest
+from django.core.management import call_command
+from django.utils import timezone
+
+pytestmark = [pytest.mark.django_db]
+
+FIELDS = (
+    "published_posts", "total_posts", "comments_written",
+    "comments_received", "last_activity",
+)
+
+
+def stats_of(user):
+    from blog.models import UserStats
+
+    stats = UserStats.objects.get(user=user)
+    return {field: getattr(stats, field) for field in FIELDS}
+
+
+def assert_matches_rebuild(*users, fields=FIELDS):
+    from blog.models import UserStats
+
+    def counters(user):
+        stats = stats_of(user)
+        return {field: stats[field] for field in fields}
+
+    incremental = [counters(user) for user in users]
+    UserStats.objects.rebuild()
+    assert incremental == [counters(user) for user in users], (
+        "Убедитесь, что сигналы поддерживают UserStats в том же"
+        " состоянии, что и пересчёт rebuild_user_stats."
+    )
+
+
+def test_user_stats_follow_posts_and_comments(
+        mixer, user, another_user, published_category
+):
+    from blog.models import Comment, Post
+
+    def new_post(**fields):
+        return Post.objects.create(
+            title="Заголовок", text="Текст", pub_date=timezone.now(),
+            author=user, category=published_category, **fields
+        )
+
+    post = new_post()
+    draft = new_post(is_published=False)
+    Comment.objects.create(post=post, author=another_user, text="Первый")
+    Comment.objects.create(post=post, author=user, text="Ответ")
+    stats = stats_of(user)
+    assert stats["published_posts"] == 1
+    assert stats["total_posts"] == 2
+    assert stats["comments_written"] == 1
+    assert stats["comments_received"] == 2
+    assert stats["last_activity"] is not None
+    assert stats_of(another_user)["comments_written"] == 1
+    assert_matches_rebuild(user, another_user)
+
+    draft.is_published = True
+    draft.save()
+    assert stats_of(user)["published_posts"] == 2
+
+    post = Post.objects.get(pk=post.pk)
+    post.author = another_user
+    post.save()
+    assert stats_of(another_user)["comments_received"] == 2, (
+        "Убедитесь, что при смене автора полученные комментарии"
+        " переходят к новому автору."
+    )
+    assert_matches_rebuild(user, another_user)
+
+    post.delete()
+    assert stats_of(another_user)["total_posts"] == 0
+    assert stats_of(user)["comments_written"] == 0
+    # Удаление не отменяет прошлую активность: сравниваются счётчики.
+    assert_matches_rebuild(user, another_user, fields=FIELDS[:-1])
+
+
+def test_rebuild_user_stats_command(user, post_with_published_location,
+                                    capsys):
+    from blog.models import UserStats
+
+    UserStats.objects.all().delete()
+    call_command("rebuild_user_stats")
+    assert "Обновлено пользователей" in capsys.readouterr().out
+    assert stats_of(user)["total_posts"] == 1
+
+
+def test_profile_shows_stats(user, another_user_client,
+                             post_with_published_location):
+    from blog.models import Comment, UserStats
+
+    Comment.objects.create(
+        post=post_with_published_location, author=user, text="Комментарий"
+    )
+    response = another_user_client.get(f"/profile/{user.username}/")
+    assert response.context["stats"].comments_written == 1, (
+        "Убедитесь, что страница профиля получает статистику"
+        " пользователя в контексте под ключом `stats`."
+    )
+    assert "Комментариев написано: 1" in response.content.decode()
+
+    UserStats.objects.filter(user=user).delete()
+    user = type(user).objects.get(pk=user.pk)
+    assert UserStats.objects.for_user(user).comments_written == 1, (
+        "Убедитесь, что недостающая статистика строится при первом"
+        " обращении."
+    )
+
+
+def test_for_user_reads_own_write_from_primary(
+        monkeypatch, user, post_with_published_location
+):
+    from django.test import override_settings
+
+    from blog.models import UserStats
+    from blogicum import routers
+
+    UserStats.objects.filter(user=user).delete()
+    user = type(user).objects.select_related("stats").get(pk=user.pk)
+    # Реплика не настроена: любое чтение с неё завершится ошибкой.
+    monkeypatch.setattr(routers.random, "choice", lambda replicas: "lag")
+    with override_settings(DATABASE_REPLICAS=["lag"]):
+        with routers.read_from_replica():
+            stats = UserStats.objects.for_user(user)
+    assert stats.total_posts == 1, (
+        "Убедитесь, что только что построенная статистика читается"
+        " с основной базы, а не с реплики."
+    )
+
+
+def test_migration_fills_user_stats(user, another_user,
+                                    post_with_published_location):
+    from importlib import import_module
+
+    from django.apps import apps
+
+    from blog.models import UserStats
+
+    migration = import_module("blog.migrations.0008_userstats")
+    expected = [stats_of(user), stats_of(another_user)]
+    UserStats.objects.all().delete()
+    migration.fill_user_stats(apps, None)
+    assert [stats_of(user), stats_of(another_user)] == expected, (
+        "Убедитесь, что миграция 0008 заполняет статистику существующих"
+        " пользователей."
+    )